@@ -0,0 +1,183 @@
+# asgi.py
+"""
+@file asgi.py
+@brief ASGI entry point. Wraps the Flask app so that every blocking part of a
+       request (scans, file reads, response streaming) runs on a bounded thread
+       pool and the event loop never waits on disk. Adds per-request timeouts and
+       backpressure (503 when too many requests are queued).
+
+       Run with any ASGI server, e.g.:  uvicorn asgi:app --port 5000
+"""
+import asyncio
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from logger import get_logger
+from main import create_app
+from services.project_registry import registry
+
+logger = get_logger(__name__)
+
+_END = object()
+
+class AsgiAdapter:
+    def __init__(self, wsgi_app, threads=None, max_pending=None, timeout=None, max_body=None):
+        self.wsgi_app = wsgi_app
+        self.threads = threads or Config.ASGI_THREADS
+        self.max_pending = max_pending or Config.ASGI_MAX_PENDING
+        self.timeout = timeout or Config.REQUEST_TIMEOUT
+        self.max_body = max_body or Config.ASGI_MAX_BODY_BYTES
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="asgi")
+        self.pending = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if self.pending >= self.max_pending:
+            await self._send_simple(send, 503, b"Server busy", [(b"retry-after", b"1")])
+            return
+        self.pending += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self.pending -= 1
+
+    async def _handle(self, scope, receive, send):
+        body = await self._read_body(receive)
+        if body is None:
+            await self._send_simple(send, 413, b"Request body too large")
+            return
+
+        # All pool calls of one request run in the same context, so the Flask request
+        # context pushed by streamed responses can be popped from another pool thread.
+        request_ctx = contextvars.copy_context()
+        environ = self._build_environ(scope, body)
+        future = self.executor.submit(request_ctx.run, self._call_app, environ)
+        try:
+            status, headers, iterable = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            logger.error("Request timed out: %s %s", scope["method"], scope["path"])
+            future.add_done_callback(lambda f: self._close_later(request_ctx, f, None))
+            await self._send_simple(send, 504, b"Request timed out")
+            return
+
+        iterator = iter(iterable)
+        future = None
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            while True:
+                # Each chunk may read files, so it is produced on the pool as well
+                future = self.executor.submit(request_ctx.run, next, iterator, _END)
+                chunk = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+                if chunk is _END:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except asyncio.TimeoutError:
+            # Headers are already sent; the only option left is to cut the response short
+            logger.error("Response streaming timed out: %s %s", scope["method"], scope["path"])
+        finally:
+            if future is not None and not future.done():
+                future.add_done_callback(lambda f: self._close_later(request_ctx, None, iterable))
+            else:
+                self._close_later(request_ctx, None, iterable)
+
+    def _close_later(self, request_ctx, future, iterable):
+        """Close the WSGI iterable on the pool once no other call of the request is running."""
+        if future is not None:
+            if future.cancelled() or future.exception() is not None:
+                return
+            iterable = future.result()[2]
+        if hasattr(iterable, "close"):
+            self.executor.submit(request_ctx.run, iterable.close)
+
+    def _call_app(self, environ):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+            return lambda data: None
+
+        iterable = self.wsgi_app(environ, start_response)
+        return response["status"], response["headers"], iterable
+
+    async def _read_body(self, receive):
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    def _build_environ(self, scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": str(server[0]),
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": str(client[0]),
+            "REMOTE_PORT": str(client[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif name == "CONTENT_LENGTH":
+                continue
+            else:
+                key = f"HTTP_{name}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        # The body is fully buffered, so its length is always known
+        environ["CONTENT_LENGTH"] = str(len(body))
+        return environ
+
+    async def _send_simple(self, send, status, body, headers=()):
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"text/plain"),
+                                (b"content-length", str(len(body)).encode())] + list(headers)})
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                registry.save_snapshots()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+def create_asgi_app(wsgi_app=None):
+    return AsgiAdapter(wsgi_app or create_app())
+
+app = create_asgi_app()
@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+"""
+@file benchmarks/__init__.py
+@brief Benchmark suite: synthetic project trees and timing of service methods and endpoints.
+       Run with `python -m benchmarks.run --help` from the repository root.
+"""
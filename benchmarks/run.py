@@ -0,0 +1,184 @@
+# benchmarks/run.py
+"""
+@file benchmarks/run.py
+@brief Times service methods directly and endpoints through the Flask test client on
+       a synthetic project tree and reports p50/p95 latency and peak traced memory.
+       Results can be saved as JSON and compared against a baseline to catch regressions:
+
+           python -m benchmarks.run --files 5000 --json results.json
+           python -m benchmarks.run --baseline results.json --threshold 1.25
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT = "bench"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the project service and API")
+    parser.add_argument("--files", type=int, default=2000, help="source files in the tree")
+    parser.add_argument("--depth", type=int, default=4, help="directory depth below src/")
+    parser.add_argument("--fanout", type=int, default=6, help="subdirectories per directory")
+    parser.add_argument("--components", type=int, default=100)
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--vendor-files", type=int, default=5000, help="files below the excluded node_modules/")
+    parser.add_argument("--large-files", type=int, default=5)
+    parser.add_argument("--large-file-kb", type=int, default=512)
+    parser.add_argument("--index-by", choices=("folder", "file"), default="folder")
+    parser.add_argument("--iterations", type=int, default=20, help="timed runs per benchmark")
+    parser.add_argument("--only", default="", help="comma-separated substrings of benchmark names to run")
+    parser.add_argument("--tree", help="reuse/keep the synthetic tree in this directory")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare p50 against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="fail when p50 exceeds the baseline by this factor")
+    return parser.parse_args(argv)
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def measure(fn, iterations, setup=None):
+    """Return timing (ms) and peak traced memory (KiB) for fn, calling setup before each run."""
+    samples = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    # Memory is traced in a separate run, tracing slows the timed ones down
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    tree = os.path.abspath(args.tree) if args.tree else os.path.join(workdir, "tree")
+    projects_dir = os.path.join(workdir, "projects")
+
+    # Config is read at import time, so the environment must be set up first
+    os.environ.update({
+        "PROJECTS_DIR": projects_dir,
+        "API_KEY": "bench",
+        "LOG_LEVEL": "WARNING",
+        "LOG_PATH": os.path.join(workdir, "bench.log"),
+        "INDEX_SNAPSHOT_DIR": "",
+        "WATCHER_ENABLED": "false",
+    })
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from benchmarks.synthetic_tree import generate_tree, write_project_meta
+    from main import create_app
+    from services.project_registry import registry
+    from services.project_service import ProjectService
+    from utils.content_cache import content_cache
+    from utils.file_handler import FileHandler
+    from utils.tree_walk import RACY_WINDOW_NS
+
+    try:
+        if not os.path.isdir(tree):
+            print(f"Generating synthetic tree in {tree} ...")
+            generate_tree(tree, files=args.files, depth=args.depth, fanout=args.fanout,
+                          components=args.components, docs=args.docs, vendor_files=args.vendor_files,
+                          large_files=args.large_files, large_file_kb=args.large_file_kb, index_by=args.index_by)
+            # Listings of just-modified directories are never trusted; let the tree settle
+            time.sleep(RACY_WINDOW_NS / 1e9)
+        write_project_meta(projects_dir, PROJECT, tree)
+
+        client = create_app().test_client()
+        headers = {"Authorization": "Bearer bench"}
+        svc = registry.get(PROJECT)
+        component = svc.get_all_components()[0]
+        doc = svc.get_documentation_list()[0]
+
+        def cold():
+            # Fresh index and empty caches, as after a restart
+            registry.invalidate()
+            content_cache.invalidate()
+
+        def get(path, extra_headers=None):
+            def run():
+                resp = client.get(path, headers={**headers, **(extra_headers or {})})
+                resp.get_data()
+                resp.close()
+                if resp.status_code != 200:
+                    raise RuntimeError(f"GET {path} returned {resp.status_code}")
+            return run
+
+        def post(path, body):
+            def run():
+                resp = client.post(path, headers=headers, json=body)
+                resp.get_data()
+                if resp.status_code != 200:
+                    raise RuntimeError(f"POST {path} returned {resp.status_code}")
+            return run
+
+        benchmarks = [
+            ("scan_files cold", lambda: FileHandler.scan_files(tree, excludes=["node_modules"]), None),
+            ("scan_files indexed", lambda: svc.scan_files(tree, excludes=["node_modules"]), None),
+            ("service files_by_category cold", lambda: ProjectService(PROJECT).get_project_files_by_category(), cold),
+            ("service files_by_category warm", svc.get_project_files_by_category, None),
+            ("service component_files warm", lambda: svc.get_component_files(component), None),
+            ("service doc_list warm", svc.get_documentation_list, None),
+            ("GET /code md cold", get(f"/{PROJECT}/code"), cold),
+            ("GET /code md", get(f"/{PROJECT}/code"), None),
+            ("GET /code json", get(f"/{PROJECT}/code?in=json"), None),
+            ("GET /code json gzip", get(f"/{PROJECT}/code?in=json", {"Accept-Encoding": "gzip"}), None),
+            ("GET /code page", get(f"/{PROJECT}/code?in=json&limit=100&prefix=src/"), None),
+            ("GET /code/components", get(f"/{PROJECT}/code/components?in=json"), None),
+            ("GET /code/component/<id> md", get(f"/{PROJECT}/code/component/{component}"), None),
+            ("GET /code/module/core md", get(f"/{PROJECT}/code/module/core"), None),
+            ("GET /docs", get(f"/{PROJECT}/docs?in=json"), None),
+            ("GET /docs/<id> md", get(f"/{PROJECT}/docs/{doc}"), None),
+            ("GET /search", get(f"/{PROJECT}/search?q=render+session&in=json"), None),
+            ("POST /context", post(f"/{PROJECT}/context", {"resources": ["module:core"], "max_tokens": 20000}), None),
+        ]
+        selected = [s for s in args.only.split(",") if s]
+
+        results = {}
+        print(f"{'benchmark':<36}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'peak KiB':>12}")
+        for name, fn, setup in benchmarks:
+            if selected and not any(s in name for s in selected):
+                continue
+            if setup is None:
+                fn()  # warm up
+            results[name] = r = measure(fn, args.iterations, setup)
+            print(f"{name:<36}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['mean_ms']:>10.2f}{r['peak_kib']:>12.1f}")
+
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+        if args.baseline:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+            regressions = [(name, baseline[name]["p50_ms"], r["p50_ms"]) for name, r in results.items()
+                           if name in baseline and r["p50_ms"] > baseline[name]["p50_ms"] * args.threshold]
+            for name, before, after in regressions:
+                print(f"REGRESSION {name}: p50 {before:.2f} ms -> {after:.2f} ms")
+            if regressions:
+                return 1
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# benchmarks/synthetic_tree.py
+"""
+@file benchmarks/synthetic_tree.py
+@brief Generates synthetic project trees (sources, components, docs, exclude-heavy
+       node_modules-style directories and large files) together with the project
+       meta file and project.config.json5 the service expects.
+"""
+import json
+import os
+import random
+
+PROJECT_CONFIG = """{
+  info: {description: "Synthetic benchmark project"},
+  stack: ["Python", "Astro"],
+  spec: "docs/spec.md",
+  tasks: "tasks.md",
+  modules: {
+    core: {base: "src", include: ["**/*.py"], exclude: []},
+    ui: {base: "src/components", include: ["**/*.astro"], exclude: []},
+  },
+  components: {base: "src/components", index_by: "%(index_by)s", file_extension: "astro,css", identifier: "slugify"},
+  config: {include: ["*.json", "*.toml"], exclude: ["node_modules"]},
+  docs: {base: "docs", include: [], exclude: [], identifier: "slugify"},
+}
+"""
+
+WORDS = ("alpha", "beta", "gamma", "delta", "render", "fetch", "user", "session", "token", "widget",
+         "layout", "router", "handler", "config", "schema", "admin", "auth", "cache", "index", "query")
+
+def _text(rng, lines):
+    return "\n".join(" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(lines)) + "\n"
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+def generate_tree(root, files=2000, depth=4, fanout=6, components=100, docs=50,
+                  vendor_files=5000, large_files=5, large_file_kb=512, index_by="folder", seed=1):
+    """
+    Create a project tree under root and return a dict describing it.
+    files source files are spread over a directory tree of the given depth/fanout,
+    vendor_files go below node_modules (excluded by the project), large_files are
+    large_file_kb each.
+    """
+    rng = random.Random(seed)
+    src = os.path.join(root, "src")
+
+    dirs = [src]
+    frontier = [src]
+    for _ in range(depth):
+        frontier = [os.path.join(d, f"pkg{i}") for d in frontier for i in range(fanout)]
+        dirs.extend(frontier)
+        if len(dirs) >= files:
+            break
+    for i in range(files):
+        kind = ("admin", "auth", "schema", "module")[i % 4] if i % 10 == 0 else "module"
+        _write(os.path.join(rng.choice(dirs), f"{kind}_{i}.py"), _text(rng, 20))
+
+    for i in range(components):
+        name = f"Widget{i}"
+        folder = os.path.join(src, "components", name)
+        _write(os.path.join(folder, f"{name}.astro"), f"<div class=\"{name}\">{_text(rng, 5)}</div>\n")
+        _write(os.path.join(folder, f"{name}.css"), f".{name} {{ color: red; }}\n")
+
+    for i in range(docs):
+        _write(os.path.join(root, "docs", f"Guide {i}.md"), f"# Guide {i}\n" + _text(rng, 40))
+    _write(os.path.join(root, "docs", "spec.md"), "# Spec\n" + _text(rng, 40))
+    _write(os.path.join(root, "tasks.md"), "".join(f"- task {i}\n" for i in range(50)))
+    _write(os.path.join(root, "package.json"), json.dumps({"name": "synthetic"}))
+    _write(os.path.join(root, "pyproject.toml"), "[project]\nname = \"synthetic\"\n")
+
+    for i in range(vendor_files):
+        _write(os.path.join(root, "node_modules", f"lib{i % 200}", "dist", f"file{i}.js"), "module.exports = 1;\n")
+
+    line = _text(rng, 1)
+    for i in range(large_files):
+        _write(os.path.join(src, f"large_{i}.py"), line * (large_file_kb * 1024 // len(line)))
+
+    _write(os.path.join(root, "project.config.json5"), PROJECT_CONFIG % {"index_by": index_by})
+    return {"root": root, "files": files, "components": components, "docs": docs,
+            "vendor_files": vendor_files, "large_files": large_files}
+
+def write_project_meta(projects_dir, name, root):
+    """Write the projects/<name>.json meta file pointing at root."""
+    os.makedirs(projects_dir, exist_ok=True)
+    with open(os.path.join(projects_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump({"project_path": root, "docs_path": "docs", "exclude": ["node_modules"]}, f)
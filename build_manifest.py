@@ -0,0 +1,75 @@
+# build_manifest.py
+"""
+@file build_manifest.py
+@brief Command line entry point that precomputes the manifest the server loads on
+       startup (categorised files, module/component/doc catalogs, styles and content
+       hashes), e.g. in CI when source trees only change at deploy time:
+
+           python build_manifest.py                  # all projects in PROJECTS_DIR
+           python build_manifest.py myproject -o build/manifest.json
+
+       Naming projects rebuilds only their entries; the others already in the
+       manifest are kept.
+"""
+import argparse
+import os
+import sys
+from config import Config
+from logger import get_logger
+from services.manifest import build_project_manifest, manifest_store, read_manifest, write_manifest
+from services.project_service import ProjectService
+
+logger = get_logger(__name__)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the precomputed project manifest")
+    parser.add_argument("projects", nargs="*", help="project names (default: every *.json in PROJECTS_DIR)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="manifest path (default: MANIFEST_PATH)")
+    parser.add_argument("--no-hashes", action="store_true", help="skip content hashes")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = args.output or Config.MANIFEST_PATH
+    if not output:
+        print("No output path: pass --output or set MANIFEST_PATH", file=sys.stderr)
+        return 2
+    # Always scan the trees: the manifest being built must not come from an older one
+    manifest_store.path = ""
+    names = args.projects or sorted(m[:-len(".json")] for m in os.listdir(Config.PROJECTS_DIR) if m.endswith(".json"))
+
+    projects = {}
+    failed = 0
+    for name in names:
+        try:
+            svc = ProjectService(name)
+            try:
+                projects[name] = build_project_manifest(svc, hashes=not args.no_hashes)
+            finally:
+                svc.close()
+        except Exception as e:
+            logger.error("Could not build manifest for project %s: %s", name, e)
+            failed += 1
+            continue
+        entry = projects[name]
+        print(f"{name}: {sum(len(f) for f in entry['files_by_category'].values())} files, "
+              f"{len(entry['modules'])} modules, {len(entry['components']['identifiers'])} components, "
+              f"{len(entry['docs']['identifiers'])} docs")
+
+    if not projects:
+        print(f"No project manifest could be built, leaving {output} unchanged", file=sys.stderr)
+        return 1
+    if args.projects:
+        try:
+            existing = read_manifest(output)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read existing manifest {output}: {e}", file=sys.stderr)
+            return 1
+        projects = {**existing, **projects}
+    write_manifest(output, projects)
+    print(f"Wrote {output} ({len(projects)} project(s))")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,41 @@ load_dotenv()
 
 class Config:
     API_KEY = os.getenv("API_KEY", "")
+    API_KEYS_FILE = os.getenv("API_KEYS_FILE", "./keys.json")
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_PATH = os.getenv("LOG_PATH", "./logs/app.log")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
     PORT = int(os.getenv("PORT", 5000))
+    PROJECTS_DIR = os.getenv("PROJECTS_DIR", "./projects")
+    PROJECT_CACHE_SIZE = int(os.getenv("PROJECT_CACHE_SIZE", 32))
+    FILE_INDEX_TTL = float(os.getenv("FILE_INDEX_TTL", 2))
+    SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", 8))
+    STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 65536))
+    CONTENT_CACHE_BYTES = int(os.getenv("CONTENT_CACHE_BYTES", 64 * 1024 * 1024))
+    CONTENT_CACHE_MAX_FILE_BYTES = int(os.getenv("CONTENT_CACHE_MAX_FILE_BYTES", 2 * 1024 * 1024))
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", 6))
+    COMPRESS_CACHE_BYTES = int(os.getenv("COMPRESS_CACHE_BYTES", 32 * 1024 * 1024))
+    WATCHER_ENABLED = os.getenv("WATCHER_ENABLED", "false").lower() in ("1", "true", "yes")
+    WATCHER_MODE = os.getenv("WATCHER_MODE", "auto")
+    WATCHER_POLL_INTERVAL = float(os.getenv("WATCHER_POLL_INTERVAL", 2))
+    SEARCH_MAX_FILE_BYTES = int(os.getenv("SEARCH_MAX_FILE_BYTES", 1024 * 1024))
+    SEARCH_REFRESH_INTERVAL = float(os.getenv("SEARCH_REFRESH_INTERVAL", 2))
+    BATCH_MAX_RESOURCES = int(os.getenv("BATCH_MAX_RESOURCES", 50))
+    LISTING_PAGE_SIZE = int(os.getenv("LISTING_PAGE_SIZE", 500))
+    LISTING_MAX_PAGE_SIZE = int(os.getenv("LISTING_MAX_PAGE_SIZE", 5000))
+    CONTEXT_CHARS_PER_TOKEN = float(os.getenv("CONTEXT_CHARS_PER_TOKEN", 4))
+    CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", 100000))
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "./logs/profiles")
+    PROFILE_TOP = int(os.getenv("PROFILE_TOP", 30))
+    ASGI_THREADS = int(os.getenv("ASGI_THREADS", 32))
+    ASGI_MAX_PENDING = int(os.getenv("ASGI_MAX_PENDING", 512))
+    ASGI_MAX_BODY_BYTES = int(os.getenv("ASGI_MAX_BODY_BYTES", 10 * 1024 * 1024))
+    REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 30))
+    MANIFEST_PATH = os.getenv("MANIFEST_PATH", "./manifest.json")
+    INDEX_SNAPSHOT_DIR = os.getenv("INDEX_SNAPSHOT_DIR", "./cache/index")
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", os.cpu_count() or 1))
+    PRELOAD_PROJECTS = os.getenv("PRELOAD_PROJECTS", "true").lower() in ("1", "true", "yes")
+    METRICS_DIR = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
@@ -3,19 +3,39 @@
 @file controllers/api.py
 @brief Defines the Flask routes and integrates with ProjectService.
 """
-from flask import Blueprint, request, jsonify, Response
-from services.project_service import ProjectService
+from flask import Blueprint, g, request, jsonify, Response, stream_with_context
+from werkzeug.http import is_resource_modified
+from services.auth import auth_table
+from services.project_registry import registry
+from services.context_pack import ContextPack
+from utils.file_handler import FileHandler
+from utils.http_cache import compute_validators
+from utils.compression import (compressed_cache, compress, compress_stream,
+                               is_compressible, negotiate_encoding)
+from config import Config
+from utils.json_stream import StreamedText, coalesce, iter_json
+from utils.profiling import RequestProfiler
 from logger import get_logger
 import os
+import time
+import uuid
 
 logger = get_logger(__name__)
 api_bp = Blueprint('api', __name__)
 
-def authenticate_request(service: ProjectService):
-    auth = request.headers.get('Authorization', '')
-    if not service.authenticate(auth):
-        return False
-    return True
+@api_bp.before_request
+def require_auth():
+    """
+    Reject requests without a key for the project before the project is loaded,
+    so unauthenticated traffic costs no disk reads or config parsing.
+    """
+    project = (request.view_args or {}).get("project")
+    if project is None:
+        return None
+    g.api_key = auth_table.authorize(request.headers.get("Authorization"), project)
+    if g.api_key is None:
+        return respond_error("Unauthorized", 401)
+    return None
 
 def respond_json(data):
     return jsonify({"status": "success", "data": data})
@@ -26,20 +46,232 @@ def respond_error(msg, code=400):
 def respond_markdown(md_content):
     return Response(md_content, mimetype='text/markdown')
 
+def respond_json_stream(data):
+    """Stream a success envelope; StreamedText values in data are emitted chunk by chunk."""
+    body = iter_json({"status": "success", "data": data})
+    return Response(stream_with_context(coalesce(body)), mimetype='application/json')
+
+def respond_markdown_stream(chunks):
+    return Response(stream_with_context(coalesce(chunks)), mimetype='text/markdown')
+
+def respond_conditional(build, parts=(), paths=(), signatures=(), last_modified=True):
+    """
+    Answer 304 Not Modified when the client's If-None-Match/If-Modified-Since still
+    match, otherwise call build() and attach the ETag and Last-Modified validators.
+    The validators are computed from the request path, parts, and the stat signatures
+    of paths/signatures, without reading any file contents. Pass last_modified=False
+    when the response also depends on a directory listing.
+    """
+    etag, modified = compute_validators((request.full_path,) + tuple(parts), paths, signatures)
+    if not last_modified:
+        modified = None
+    if not is_resource_modified(request.environ, etag=etag, last_modified=modified):
+        resp = Response(status=304)
+    else:
+        resp = build()
+        if isinstance(resp, tuple):
+            # Errors are not cacheable
+            return resp
+    resp.set_etag(etag)
+    if modified is not None:
+        resp.last_modified = modified
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+PAGE_ARGS = ("limit", "cursor", "prefix", "ext", "category", "fields")
+
+def wants_page():
+    """Listings are paginated as soon as any paging, filter or field argument is given."""
+    return any(arg in request.args for arg in PAGE_ARGS)
+
+def select_fields(item, fields):
+    """Pick fields from a listing item; size and mtime are stat'ed on demand."""
+    row = {}
+    signature = None
+    for field in fields:
+        if field in ("size", "mtime"):
+            if signature is None:
+                signature = FileHandler.stat_signature(item["path"]) or (None, None)
+            if field == "size":
+                row[field] = signature[1]
+            else:
+                row[field] = signature[0] / 1e9 if signature[0] is not None else None
+        else:
+            row[field] = item.get(field)
+    return row
+
+def respond_listing_page(listing, title, fields_allowed, default_fields):
+    """
+    Answer one page of a SortedListing according to the limit, cursor, prefix, ext,
+    category and fields query arguments.
+    """
+    try:
+        limit = min(max(int(request.args.get("limit", Config.LISTING_PAGE_SIZE)), 1), Config.LISTING_MAX_PAGE_SIZE)
+    except ValueError:
+        return respond_error("limit must be an integer", 400)
+    fields = [f for f in request.args.get("fields", "").split(",") if f] or list(default_fields)
+    unknown = [f for f in fields if f not in fields_allowed]
+    if unknown:
+        return respond_error(f"Unknown fields: {', '.join(unknown)}", 400)
+
+    exts = {e.lstrip(".") for e in request.args.get("ext", "").split(",") if e}
+    category = request.args.get("category")
+    predicate = None
+    if exts or category:
+        predicate = lambda item: ((not exts or item.get("ext") in exts) and
+                                  (not category or item.get("category") == category))
+    try:
+        items, next_cursor = listing.page(limit, cursor=request.args.get("cursor"),
+                                          prefix=request.args.get("prefix", ""), predicate=predicate)
+    except ValueError as e:
+        return respond_error(str(e), 400)
+    rows = [select_fields(item, fields) for item in items]
+    fmt = request.args.get("in", "md")
+
+    def build():
+        if fmt == "json":
+            return respond_json({"items": rows, "next_cursor": next_cursor})
+        else:
+            md = f"# {title}\n"
+            for row in rows:
+                md += "- " + " | ".join(str(row[f]) for f in fields) + "\n"
+            if next_cursor:
+                md += f"\nNext cursor: `{next_cursor}`\n"
+            return respond_markdown(md)
+    return respond_conditional(build, parts=[rows, next_cursor], last_modified=False)
+
+@api_bp.after_request
+def compress_response(resp):
+    """
+    gzip/deflate successful text and JSON responses when the client accepts it.
+    Compressed bodies are cached by ETag; streamed responses are compressed on the
+    fly and their compressed body is cached once the stream completed.
+    Whenever an encoding is negotiated the ETag is weak, including on 304 responses
+    and on bodies too small to compress, so a 304 carries the validator of the 200.
+    """
+    if resp.status_code == 304:
+        etag, _ = resp.get_etag()
+        if etag:
+            resp.vary.add("Accept-Encoding")
+            if "Accept-Encoding" in request.headers and negotiate_encoding(request.accept_encodings):
+                resp.set_etag(etag, weak=True)
+        return resp
+    if resp.status_code != 200 or resp.direct_passthrough or "Content-Encoding" in resp.headers:
+        return resp
+    if not is_compressible(resp.mimetype):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    if "Accept-Encoding" not in request.headers:
+        return resp
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return resp
+
+    etag, _ = resp.get_etag()
+    if not resp.is_streamed and resp.calculate_content_length() < Config.COMPRESS_MIN_SIZE:
+        if etag:
+            resp.set_etag(etag, weak=True)
+        return resp
+
+    cached = compressed_cache.get(etag, encoding) if etag else None
+    if cached is not None:
+        # Drop the (not yet consumed) body without reading any files
+        resp.close()
+        resp.response = [cached]
+        resp.content_length = len(cached)
+    elif resp.is_streamed:
+        on_complete = None
+        if etag:
+            on_complete = lambda body: compressed_cache.put(etag, encoding, body)
+        resp.response = compress_stream(resp.iter_encoded(), encoding, on_complete=on_complete,
+                                        max_collect=compressed_cache.max_bytes)
+        resp.headers.pop("Content-Length", None)
+    else:
+        body = compress(resp.get_data(), encoding)
+        if etag:
+            compressed_cache.put(etag, encoding, body)
+        resp.set_data(body)
+
+    resp.headers["Content-Encoding"] = encoding
+    if etag:
+        # The encoded bytes differ from the identity representation
+        resp.set_etag(etag, weak=True)
+    return resp
+
+# X-Profile / ?profile= value -> (cpu, memory)
+PROFILE_MODES = {"1": (True, False), "cpu": (True, False), "memory": (False, True), "all": (True, True)}
+
+def start_profiling():
+    """Profile this request if asked to with X-Profile or ?profile= (runs after require_auth)."""
+    mode = request.headers.get("X-Profile") or request.args.get("profile")
+    if mode not in PROFILE_MODES:
+        return
+    if g.get("api_key") is None:
+        return
+    cpu, memory = PROFILE_MODES[mode]
+    profiler = RequestProfiler(cpu=cpu, memory=memory)
+    if not profiler.start():
+        g.profile_status = "busy"
+        return
+    g.profiler = profiler
+
+def finish_profiling(resp):
+    """
+    Stop the request's profiler and either return its report as the response body
+    (default) or, with X-Profile-Output: store / ?profile_output=store, save it under PROFILE_DIR.
+    """
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        status = g.pop("profile_status", None)
+        if status:
+            resp.headers["X-Profile-Status"] = status
+        return resp
+    try:
+        # Streamed bodies are produced here so that their reads are part of the profile
+        resp.get_data()
+    finally:
+        profiler.stop()
+
+    output = request.headers.get("X-Profile-Output") or request.args.get("profile_output", "inline")
+    if output == "store":
+        endpoint = request.endpoint.split(".")[-1]
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.view_args['project']}-{endpoint}-{uuid.uuid4().hex[:8]}"
+        profiler.save(name)
+        resp.headers["X-Profile-Status"] = "stored"
+        resp.headers["X-Profile-Id"] = name
+        return resp
+
+    resp.set_data(profiler.report())
+    resp.mimetype = "text/plain"
+    if resp.status_code == 304:
+        resp.status_code = 200
+    for header in ("ETag", "Last-Modified"):
+        resp.headers.pop(header, None)
+    resp.headers["Cache-Control"] = "no-store"
+    resp.headers["X-Profile-Status"] = "inline"
+    return resp
+
+if Config.PROFILING_ENABLED:
+    # Only registered when enabled, so unprofiled deployments pay nothing per request.
+    # After compress_response in registration order, so it runs before it.
+    api_bp.before_request(start_profiling)
+    api_bp.after_request(finish_profiling)
+
 @api_bp.route("/<project>/info", methods=["GET"])
 def get_project_info(project):
     logger.debug("GET /<project>/info called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
         fmt = request.args.get("in", "md")
-        data = svc.get_project_info()
-        if fmt == "json":
-            return respond_json(data)
-        else:
-            md = f"# Project Info\n**Description:** {data['description']}\n**URL:** {data['url']}"
-            return respond_markdown(md)
+
+        def build():
+            data = svc.get_project_info()
+            if fmt == "json":
+                return respond_json(data)
+            else:
+                md = f"# Project Info\n**Description:** {data['description']}\n**URL:** {data['url']}"
+                return respond_markdown(md)
+        return respond_conditional(build, signatures=svc.config_signature)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -48,16 +280,17 @@ def get_project_info(project):
 def get_project_stack(project):
     logger.debug("GET /<project>/stack called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
-        data = svc.get_project_stack()
+        svc = registry.get(project)
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(data)
-        else:
-            md = "# Project Stack\n" + "\n".join([f"- {item}" for item in data])
-            return respond_markdown(md)
+
+        def build():
+            data = svc.get_project_stack()
+            if fmt == "json":
+                return respond_json(data)
+            else:
+                md = "# Project Stack\n" + "\n".join([f"- {item}" for item in data])
+                return respond_markdown(md)
+        return respond_conditional(build, signatures=svc.config_signature)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -66,17 +299,20 @@ def get_project_stack(project):
 def get_project_spec(project):
     logger.debug("GET /<project>/spec called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
-        data = svc.get_project_spec()
+        svc = registry.get(project)
         fmt = request.args.get("in", "md")
-        content = data.get("specification","")
-        if fmt == "json":
-            return respond_json(data)
-        else:
-            md = f"# Project Specification\n```markdown\n{content}\n```"
-            return respond_markdown(md)
+
+        def build():
+            data = svc.get_project_spec()
+            content = data.get("specification","")
+            if fmt == "json":
+                return respond_json(data)
+            else:
+                md = f"# Project Specification\n```markdown\n{content}\n```"
+                return respond_markdown(md)
+        spec_path = svc.get_config_file_path("spec")
+        return respond_conditional(build, paths=[spec_path] if spec_path else [],
+                                   signatures=svc.config_signature)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -85,16 +321,19 @@ def get_project_spec(project):
 def get_project_tasks(project):
     logger.debug("GET /<project>/tasks called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
-        tasks = svc.get_project_tasks()
+        svc = registry.get(project)
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(tasks)
-        else:
-            md = "# Project Tasks\n" + "\n".join([f"- {t}" for t in tasks])
-            return respond_markdown(md)
+
+        def build():
+            tasks = svc.get_project_tasks()
+            if fmt == "json":
+                return respond_json(tasks)
+            else:
+                md = "# Project Tasks\n" + "\n".join([f"- {t}" for t in tasks])
+                return respond_markdown(md)
+        tasks_path = svc.get_config_file_path("tasks")
+        return respond_conditional(build, paths=[tasks_path] if tasks_path else [],
+                                   signatures=svc.config_signature)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -103,16 +342,17 @@ def get_project_tasks(project):
 def get_project_config(project):
     logger.debug("GET /<project>/config called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
         files = svc.get_project_config_files()
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(files)
-        else:
-            md = "# Project Config Files\n" + "\n".join([f"- {f}" for f in files])
-            return respond_markdown(md)
+
+        def build():
+            if fmt == "json":
+                return respond_json(files)
+            else:
+                md = "# Project Config Files\n" + "\n".join([f"- {f}" for f in files])
+                return respond_markdown(md)
+        return respond_conditional(build, parts=[files], last_modified=False)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -121,22 +361,29 @@ def get_project_config(project):
 def list_all_project_files(project):
     logger.debug("GET /<project>/code called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
+
+        if wants_page():
+            return respond_listing_page(svc.get_file_listing(), "Project Files",
+                                        ("path", "relpath", "name", "ext", "category", "size", "mtime", "hash"),
+                                        ("path", "category"))
 
         data = svc.get_project_files_by_category()
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(data)
-        else:
-            # Convert to markdown
-            md = "# Project Files\n"
-            for cat, files in data.items():
-                md += f"## {cat.capitalize()}\n"
-                for f in files:
-                    md += f"- {f}\n"
-            return respond_markdown(md)
+
+        def build():
+            if fmt == "json":
+                return respond_json_stream(data)
+            else:
+                # Convert to markdown
+                def render():
+                    yield "# Project Files\n"
+                    for cat, files in data.items():
+                        yield f"## {cat.capitalize()}\n"
+                        for f in files:
+                            yield f"- {f}\n"
+                return respond_markdown_stream(render())
+        return respond_conditional(build, parts=[data], last_modified=False)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -145,17 +392,20 @@ def list_all_project_files(project):
 def list_all_modules(project):
     logger.debug("GET /<project>/code/modules called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
-
-        modules = svc.get_all_modules()
+        svc = registry.get(project)
+        if wants_page():
+            return respond_listing_page(svc.get_module_listing(), "Modules",
+                                        ("name", "base", "include", "exclude"), ("name",))
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(modules)
-        else:
-            md = "# Modules\n" + "\n".join([f"- {m}" for m in modules])
-            return respond_markdown(md)
+
+        def build():
+            modules = svc.get_all_modules()
+            if fmt == "json":
+                return respond_json(modules)
+            else:
+                md = "# Modules\n" + "\n".join([f"- {m}" for m in modules])
+                return respond_markdown(md)
+        return respond_conditional(build, signatures=svc.config_signature)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -164,17 +414,18 @@ def list_all_modules(project):
 def get_specific_module_files(project, identifier):
     logger.debug("GET /<project>/code/module/<identifier> called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
 
         files = svc.get_module_files(identifier)
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(files)
-        else:
-            md = f"# Module: {identifier}\n" + "\n".join([f"- {f}" for f in files])
-            return respond_markdown(md)
+
+        def build():
+            if fmt == "json":
+                return respond_json(files)
+            else:
+                md = f"# Module: {identifier}\n" + "\n".join([f"- {f}" for f in files])
+                return respond_markdown(md)
+        return respond_conditional(build, parts=[files], last_modified=False)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -183,16 +434,17 @@ def get_specific_module_files(project, identifier):
 def list_all_components(project):
     logger.debug("GET /<project>/code/components called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
         comps = svc.get_all_components()
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(comps)
-        else:
-            md = "# Components\n" + "\n".join([f"- {c}" for c in comps])
-            return respond_markdown(md)
+
+        def build():
+            if fmt == "json":
+                return respond_json(comps)
+            else:
+                md = "# Components\n" + "\n".join([f"- {c}" for c in comps])
+                return respond_markdown(md)
+        return respond_conditional(build, parts=[comps], last_modified=False)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -201,27 +453,29 @@ def list_all_components(project):
 def get_specific_component_code(project, identifier):
     logger.debug("GET /<project>/code/component/<identifier> called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
 
         files = svc.get_component_files(identifier)
         fmt = request.args.get("in", "md")
 
-        if fmt == "json":
-            # Return JSON with files and their contents
-            data = {}
-            for f in files:
-                data[os.path.basename(f)] = FileHandler.read_file(f)
-            return respond_json({"component_name": identifier, "files": data})
-        else:
-            # Return a markdown combined
-            md = f"# Component: {identifier}\n"
-            for f in files:
-                ext = os.path.splitext(f)[1].lstrip(".")
-                content = FileHandler.read_file(f)
-                md += f"\n## {os.path.basename(f)}\n```{ext}\n{content}\n```\n"
-            return respond_markdown(md)
+        def build():
+            if fmt == "json":
+                # Return JSON with files and their contents, read lazily while streaming
+                data = {}
+                for f in files:
+                    data[os.path.basename(f)] = StreamedText(FileHandler.iter_file_chunks(f))
+                return respond_json_stream({"component_name": identifier, "files": data})
+            else:
+                # Return a markdown combined
+                def render():
+                    yield f"# Component: {identifier}\n"
+                    for f in files:
+                        ext = os.path.splitext(f)[1].lstrip(".")
+                        yield f"\n## {os.path.basename(f)}\n```{ext}\n"
+                        yield from FileHandler.iter_file_chunks(f) or ()
+                        yield "\n```\n"
+                return respond_markdown_stream(render())
+        return respond_conditional(build, parts=[files], paths=files, last_modified=False)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -230,17 +484,21 @@ def get_specific_component_code(project, identifier):
 def list_documentation(project):
     logger.debug("GET /<project>/docs called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
+        if wants_page():
+            return respond_listing_page(svc.get_doc_listing(), "Documentation",
+                                        ("id", "path", "name", "ext", "size", "mtime"), ("id",))
 
         docs = svc.get_documentation_list()
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(docs)
-        else:
-            md = "# Documentation\n" + "\n".join([f"- {d}" for d in docs])
-            return respond_markdown(md)
+
+        def build():
+            if fmt == "json":
+                return respond_json(docs)
+            else:
+                md = "# Documentation\n" + "\n".join([f"- {d}" for d in docs])
+                return respond_markdown(md)
+        return respond_conditional(build, parts=[docs], last_modified=False)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -249,20 +507,23 @@ def list_documentation(project):
 def get_specific_documentation(project, identifier):
     logger.debug("GET /<project>/docs/<identifier> called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
 
-        doc = svc.get_documentation_file(identifier)
-        if not doc:
+        doc_path = svc.get_documentation_path(identifier)
+        if not doc_path:
             return respond_error("Not found", 404)
-
         fmt = request.args.get("in", "md")
-        if fmt == "json":
-            return respond_json(doc)
-        else:
-            md = f"# {doc['title']}\n```markdown\n{doc['content']}\n```"
-            return respond_markdown(md)
+
+        def build():
+            doc = svc.get_documentation_file(identifier)
+            if not doc:
+                return respond_error("Not found", 404)
+            if fmt == "json":
+                return respond_json(doc)
+            else:
+                md = f"# {doc['title']}\n```markdown\n{doc['content']}\n```"
+                return respond_markdown(md)
+        return respond_conditional(build, parts=[doc_path], paths=[doc_path], last_modified=False)
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -271,17 +532,177 @@ def get_specific_documentation(project, identifier):
 def get_project_styles(project):
     logger.debug("GET /<project>/code/styles called")
     try:
-        svc = ProjectService(project)
-        if not authenticate_request(svc):
-            return respond_error("Unauthorized", 401)
+        svc = registry.get(project)
 
         styles = svc.get_project_styles()
         fmt = request.args.get("in", "md")
+
+        def build():
+            if fmt == "json":
+                return respond_json(styles)
+            else:
+                md = "# Styles\n" + "\n".join([f"- {s}" for s in styles])
+                return respond_markdown(md)
+        return respond_conditional(build, parts=[styles], last_modified=False)
+    except Exception as e:
+        logger.error(str(e))
+        return respond_error(str(e), 500)
+
+@api_bp.route("/<project>/search", methods=["GET"])
+def search_project(project):
+    logger.debug("GET /<project>/search called")
+    try:
+        svc = registry.get(project)
+
+        query = request.args.get("q", "").strip()
+        if not query:
+            return respond_error("Missing query parameter q", 400)
+        limit = request.args.get("limit", 20, type=int)
+        results = svc.search(query, max(1, min(limit, 100)))
+        fmt = request.args.get("in", "md")
+
+        def build():
+            if fmt == "json":
+                return respond_json(results)
+            else:
+                md = f"# Search: {query}\n"
+                for r in results:
+                    md += f"\n## {r['path']}\n"
+                    md += "\n".join([f"- L{m['line']}: `{m['text']}`" for m in r["matches"]]) + "\n"
+                return respond_markdown(md)
+        return respond_conditional(build, parts=[results], last_modified=False)
+    except Exception as e:
+        logger.error(str(e))
+        return respond_error(str(e), 500)
+
+def parse_resource(item):
+    """
+    Accept "component:header" style strings or {"type": ..., "id": ...} objects.
+    Raises ValueError when an object's id is neither a string nor null.
+    """
+    if isinstance(item, dict):
+        identifier = item.get("id")
+        if identifier is not None and not isinstance(identifier, str):
+            raise ValueError("Resource id must be a string")
+        return str(item.get("type", "")), identifier
+    kind, _, identifier = str(item).partition(":")
+    return kind, identifier or None
+
+def parse_priority_rules(rules):
+    """Validate [{"pattern": glob, "priority": int}] context rules; raises ValueError."""
+    if not isinstance(rules, list):
+        raise ValueError("priority must be a list of {pattern, priority} objects")
+    parsed = []
+    for rule in rules:
+        if not isinstance(rule, dict) or not isinstance(rule.get("pattern"), str):
+            raise ValueError("priority rules must be objects with a string pattern")
+        priority = rule.get("priority", 0)
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise ValueError("priority rule priorities must be integers")
+        parsed.append({"pattern": rule["pattern"], "priority": priority})
+    return parsed
+
+def resolve_resources(svc, items):
+    """
+    Resolve resource references against one service (one config load, shared scans).
+    Returns (resources, errors).
+    """
+    resources = []
+    errors = []
+    for item in items:
+        try:
+            kind, identifier = parse_resource(item)
+            files = svc.resolve_resource(kind, identifier)
+        except ValueError as e:
+            errors.append({"resource": item, "message": str(e)})
+            continue
+        if not files:
+            errors.append({"resource": item, "message": "Not found"})
+            continue
+        resources.append({"type": kind, "id": identifier, "files": files})
+    return resources, errors
+
+@api_bp.route("/<project>/batch", methods=["POST"])
+def batch_resources(project):
+    logger.debug("POST /<project>/batch called")
+    try:
+        svc = registry.get(project)
+
+        body = request.get_json(silent=True) or {}
+        items = body.get("resources", [])
+        if not isinstance(items, list) or not items:
+            return respond_error("Body must contain a non-empty resources list", 400)
+        if len(items) > Config.BATCH_MAX_RESOURCES:
+            return respond_error(f"At most {Config.BATCH_MAX_RESOURCES} resources per batch", 400)
+        fmt = body.get("in", request.args.get("in", "md"))
+
+        resources, errors = resolve_resources(svc, items)
+        unique_files = dict.fromkeys(f for res in resources for f in res["files"])
+
         if fmt == "json":
-            return respond_json(styles)
+            # Each file is read once, however many resources reference it
+            files = {f: StreamedText(FileHandler.iter_file_chunks(f)) for f in unique_files}
+            return respond_json_stream({"resources": resources, "files": files, "errors": errors})
         else:
-            md = "# Styles\n" + "\n".join([f"- {s}" for s in styles])
-            return respond_markdown(md)
+            def render():
+                contents = {}
+                yield f"# Batch: {project}\n"
+                for res in resources:
+                    title = f"{res['type']}: {res['id']}" if res["id"] else res["type"]
+                    yield f"\n# {title.capitalize()}\n"
+                    for f in res["files"]:
+                        if f not in contents:
+                            contents[f] = FileHandler.read_file(f)
+                        ext = os.path.splitext(f)[1].lstrip(".")
+                        yield f"\n## {os.path.basename(f)}\n```{ext}\n{contents[f]}\n```\n"
+                if errors:
+                    yield "\n# Errors\n" + "".join([f"- {e['resource']}: {e['message']}\n" for e in errors])
+            return respond_markdown_stream(render())
+    except Exception as e:
+        logger.error(str(e))
+        return respond_error(str(e), 500)
+
+@api_bp.route("/<project>/context", methods=["POST"])
+def build_context_pack(project):
+    logger.debug("POST /<project>/context called")
+    try:
+        svc = registry.get(project)
+
+        body = request.get_json(silent=True) or {}
+        items = body.get("resources", [])
+        if not isinstance(items, list) or not items:
+            return respond_error("Body must contain a non-empty resources list", 400)
+        if len(items) > Config.BATCH_MAX_RESOURCES:
+            return respond_error(f"At most {Config.BATCH_MAX_RESOURCES} resources per request", 400)
+        try:
+            max_tokens = min(int(body.get("max_tokens", Config.CONTEXT_MAX_TOKENS)), Config.CONTEXT_MAX_TOKENS)
+            max_bytes = int(body["max_bytes"]) if "max_bytes" in body else None
+        except (TypeError, ValueError):
+            return respond_error("max_tokens and max_bytes must be integers", 400)
+        fmt = body.get("in", request.args.get("in", "md"))
+
+        settings = svc.get_context_settings()
+        try:
+            rules = parse_priority_rules(body.get("priority", settings["priority"]))
+        except ValueError as e:
+            return respond_error(str(e), 400)
+        max_file_tokens = body.get("max_file_tokens", settings["max_file_tokens"])
+        if isinstance(max_file_tokens, bool) or not isinstance(max_file_tokens, int) or max_file_tokens < 0:
+            return respond_error("max_file_tokens must be a non-negative integer", 400)
+        max_chars = int(max_tokens * Config.CONTEXT_CHARS_PER_TOKEN)
+        if max_bytes is not None:
+            max_chars = min(max_chars, max_bytes)
+
+        resources, errors = resolve_resources(svc, items)
+        pack = ContextPack(svc.project_path, max_chars,
+                           max_file_chars=int(max_file_tokens * Config.CONTEXT_CHARS_PER_TOKEN), rules=rules)
+        pack.build(f for res in resources for f in res["files"])
+        pack.errors = errors + pack.errors
+
+        if fmt == "json":
+            return respond_json(pack.to_dict())
+        else:
+            return respond_markdown(pack.to_markdown(project))
     except Exception as e:
         logger.error(str(e))
         return respond_error(str(e), 500)
@@ -1,34 +1,142 @@
 # logger.py
 """
 @file logger.py
-@brief Configures logging for the application.
+@brief Configures logging for the application. Module loggers share a single
+       QueueHandler; records are formatted and written (console + rotating file)
+       by a QueueListener thread, so request threads never block on log I/O.
+       Records are emitted as JSON lines (or text with LOG_FORMAT=text) and carry
+       the id of the request they were logged from. Pre-forked workers send their
+       records to the parent, which is the only process writing (and rotating) LOG_PATH.
 """
+import atexit
+import contextvars
+import json
 import logging
+import multiprocessing
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from config import Config
 
 # Ensure logs directory exists
 os.makedirs(os.path.dirname(Config.LOG_PATH), exist_ok=True)
 
-def get_logger(name: str):
-    logger = logging.getLogger(name)
-    logger.setLevel(Config.LOG_LEVEL.upper())
+# Id of the request being handled by the current thread / task (set in main.py)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed with extra={...}
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
 
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        if getattr(record, "request_id", None):
+            data["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                data[key] = value
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+class RequestQueueHandler(QueueHandler):
+    def prepare(self, record):
+        """
+        Capture what depends on the calling thread (message arguments, request id,
+        exception traceback) and leave the formatting and I/O to the listener thread.
+        """
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _build_handlers():
+    if Config.LOG_FORMAT == "text":
+        formatter = logging.Formatter("[%(asctime)s] %(levelname)s in %(name)s: %(message)s")
+    else:
+        formatter = JsonFormatter()
     # Console handler
     ch = logging.StreamHandler()
-    ch.setLevel(Config.LOG_LEVEL.upper())
-
     # File handler
     fh = RotatingFileHandler(Config.LOG_PATH, maxBytes=1048576, backupCount=5)
-    fh.setLevel(Config.LOG_LEVEL.upper())
+    for handler in (ch, fh):
+        handler.setLevel(Config.LOG_LEVEL.upper())
+        handler.setFormatter(formatter)
+    return ch, fh
+
+class _ForwardHandler(QueueHandler):
+    """Sends records (already prepared by RequestQueueHandler) to the parent process."""
+    def prepare(self, record):
+        return record
 
-    formatter = logging.Formatter("[%(asctime)s] %(levelname)s in %(name)s: %(message)s")
-    ch.setFormatter(formatter)
-    fh.setFormatter(formatter)
+_console_handler, _file_handler = _build_handlers()
+_queue_handler = RequestQueueHandler(queue.SimpleQueue())
+_listener = QueueListener(_queue_handler.queue, _console_handler, _file_handler, respect_handler_level=True)
+_listener.start()
 
-    if not logger.handlers:
-        logger.addHandler(ch)
-        logger.addHandler(fh)
+# Set by share_log_file() in a pre-fork parent; workers forward their records through it
+_forward_queue = None
+_forward_listener = None
+_forwarding = False
 
+def share_log_file():
+    """
+    Call in a pre-fork parent before forking workers: they then forward their records
+    to this process instead of writing LOG_PATH themselves, so only one process ever
+    writes and rotates the file.
+    """
+    global _forward_queue, _forward_listener
+    if _forward_queue is not None:
+        return
+    _forward_queue = multiprocessing.get_context("fork").Queue()
+    _forward_listener = QueueListener(_forward_queue, _file_handler, respect_handler_level=True)
+    _forward_listener.start()
+
+def _stop_listener():
+    if _listener._thread is not None:
+        _listener.stop()
+
+def stop_logging():
+    """Write out every queued record and stop the listener thread(s)."""
+    _stop_listener()
+    if _forwarding:
+        # Wait for the queue's feeder thread to hand every record over to the parent
+        _forward_queue.close()
+        _forward_queue.join_thread()
+    elif _forward_listener is not None and _forward_listener._thread is not None:
+        _forward_listener.stop()
+
+def _restart_listener_in_child():
+    global _forwarding
+    # The listener thread does not survive fork; workers get a fresh queue and thread
+    _queue_handler.queue = _listener.queue = queue.SimpleQueue()
+    if _forward_queue is not None:
+        _forwarding = True
+        forward = _ForwardHandler(_forward_queue)
+        forward.setLevel(Config.LOG_LEVEL.upper())
+        _listener.handlers = (_console_handler, forward)
+        # Drop the inherited file stream; the parent owns LOG_PATH
+        _file_handler.close()
+    _listener.start()
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_stop_listener, after_in_parent=_listener.start,
+                        after_in_child=_restart_listener_in_child)
+
+def get_logger(name: str):
+    logger = logging.getLogger(name)
+    logger.setLevel(Config.LOG_LEVEL.upper())
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
     return logger
@@ -3,17 +3,60 @@
 @file main.py
 @brief Entry point for the Flask application.
 """
-from flask import Flask
-from controllers.api import api_bp
+import atexit
+import time
+import uuid
+from flask import Flask, Response, g, request
+from controllers.api import api_bp, respond_error
 from config import Config
-from logger import get_logger
+from logger import get_logger, request_id_var
+from services.auth import auth_table
+from services.project_registry import registry
+from utils.metrics import REQUEST_LATENCY, metrics
+from utils.watcher import watcher
 
 logger = get_logger(__name__)
 
-def create_app():
+def create_app(start_watcher=True):
     app = Flask(__name__)
     app.register_blueprint(api_bp)
 
+    if start_watcher and Config.WATCHER_ENABLED:
+        watcher.start()
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+        g.request_id = request.headers.get("X-Request-ID", "")[:128] or uuid.uuid4().hex
+        g.request_id_token = request_id_var.set(g.request_id)
+
+    @app.after_request
+    def record_status(resp):
+        g.response_status = resp.status_code
+        resp.headers["X-Request-ID"] = g.request_id
+        return resp
+
+    @app.teardown_request
+    def record_latency(exc):
+        # Runs once streamed responses have finished sending
+        start = g.pop("request_start", None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        status = 500 if exc is not None else g.pop("response_status", 500)
+        REQUEST_LATENCY.observe(duration, route, request.method, status)
+        logger.info("%s %s %s", request.method, request.path, status,
+                    extra={"status": status, "duration_ms": round(duration * 1000, 3)})
+        request_id_var.reset(g.pop("request_id_token"))
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        # Metrics cover every project, so only keys scoped to all of them may read them
+        if auth_table.authorize(request.headers.get("Authorization"), "*") is None:
+            return respond_error("Unauthorized", 401)
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
     @app.route("/health", methods=["GET"])
     def health():
         logger.debug("Health check endpoint called")
@@ -23,4 +66,5 @@ def create_app():
 
 if __name__ == "__main__":
     app = create_app()
+    atexit.register(registry.save_snapshots)
     app.run(host="0.0.0.0", port=Config.PORT, debug=False)
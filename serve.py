@@ -0,0 +1,140 @@
+# serve.py
+"""
+@file serve.py
+@brief Production launcher: pre-forks SERVER_WORKERS processes sharing one listening
+       socket. Project configs, file indexes and catalogs are loaded in the parent
+       before forking, so every worker starts warm and shares them copy-on-write.
+"""
+import gc
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from werkzeug.serving import make_server
+from config import Config
+from logger import get_logger, share_log_file, stop_logging
+from main import create_app
+from services.project_registry import registry
+from utils.metrics import metrics
+from utils.tree_walk import shutdown_scan_executors
+from utils.watcher import watcher
+
+logger = get_logger(__name__)
+
+class PreforkServer:
+    def __init__(self, app, host="0.0.0.0", port=None, workers=None):
+        self.app = app
+        self.host = host
+        self.port = Config.PORT if port is None else port
+        self.workers = max(1, workers or Config.SERVER_WORKERS)
+        self.server = None
+        self.children = {}
+        self.stopping = False
+        self.metrics_tmpdir = None
+
+    def run(self):
+        self.server = make_server(self.host, self.port, self.app, threaded=True)
+        # Workers race for accept(); the losers must not block inside it
+        self.server.socket.setblocking(False)
+
+        self._share_metrics()
+        # Workers send their log records here; several processes rotating LOG_PATH would lose records
+        share_log_file()
+        # Forked children only inherit the calling thread: stop helper threads first
+        shutdown_scan_executors()
+        # Keep the preloaded objects out of the collector so its passes in the
+        # workers do not touch (and copy) the shared pages
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        logger.info("Serving on %s:%s with %s worker(s)", self.host, self.port, self.workers)
+        for _ in range(self.workers):
+            self._spawn()
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            if self.children.pop(pid, None) is None:
+                continue
+            if not self.stopping:
+                logger.warning("Worker %s exited with status %s, restarting", pid, status)
+                time.sleep(0.1)
+                self._spawn()
+        self.server.server_close()
+        if self.metrics_tmpdir is not None:
+            shutil.rmtree(self.metrics_tmpdir, ignore_errors=True)
+        logger.info("Server stopped")
+
+    def _share_metrics(self):
+        """Let every worker's /metrics report the totals of all workers."""
+        directory = Config.METRICS_DIR
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            # Files of an earlier server run would be added to this run's totals
+            for name in os.listdir(directory):
+                if name.endswith(".json"):
+                    os.unlink(os.path.join(directory, name))
+        else:
+            directory = self.metrics_tmpdir = tempfile.mkdtemp(prefix="metrics-")
+        metrics.share(directory)
+        # What preloading counted is recorded once here; workers start from zero
+        metrics.dump(gauges=False)
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = True
+            return
+        code = 0
+        try:
+            self._worker()
+        except Exception as e:
+            logger.error("Worker %s crashed: %s", os.getpid(), e)
+            code = 1
+        finally:
+            # os._exit skips atexit handlers; write the final metrics and flush the log queue explicitly
+            try:
+                metrics.stop_flushing()
+            except OSError as e:
+                logger.warning("Could not write final metrics of worker %s: %s", os.getpid(), e)
+            stop_logging()
+            os._exit(code)
+
+    def _worker(self):
+        # shutdown() waits for serve_forever() to return, so it cannot run in this thread
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.server.shutdown).start())
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        metrics.reset()
+        metrics.start_flushing(Config.METRICS_FLUSH_INTERVAL)
+        if Config.WATCHER_ENABLED:
+            watcher.start()
+            registry.attach_watcher()
+        logger.debug("Worker %s started", os.getpid())
+        self.server.serve_forever()
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+
+def main():
+    app = create_app(start_watcher=False)
+    if Config.PRELOAD_PROJECTS:
+        registry.warm()
+        # The next restart revalidates these listings instead of walking the trees
+        registry.save_snapshots()
+    PreforkServer(app).run()
+
+if __name__ == "__main__":
+    sys.exit(main())
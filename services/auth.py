@@ -0,0 +1,97 @@
+# services/auth.py
+"""
+@file services/auth.py
+@brief API key authentication that runs before any project is loaded. Keys are
+       stored as SHA-256 hashes with per-project scopes, loaded once from
+       API_KEYS_FILE (reloaded when the file changes) plus the legacy API_KEY,
+       and compared in constant time.
+"""
+import hashlib
+import hmac
+import json
+import threading
+import time
+from config import Config
+from logger import get_logger
+from utils.file_handler import FileHandler
+
+logger = get_logger(__name__)
+
+# How often (seconds) the keys file is checked for changes
+RELOAD_INTERVAL = 1.0
+
+def hash_key(key):
+    """Return the stored form ("sha256:<hex>") of an API key."""
+    return "sha256:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+class ApiKey:
+    __slots__ = ("name", "digest", "projects")
+
+    def __init__(self, name, digest, projects):
+        self.name = name
+        self.digest = digest
+        self.projects = frozenset(projects)
+
+    def allows(self, project):
+        return "*" in self.projects or project in self.projects
+
+class AuthTable:
+    def __init__(self, keys_file=None, legacy_key=None):
+        self.keys_file = Config.API_KEYS_FILE if keys_file is None else keys_file
+        self.legacy_key = Config.API_KEY if legacy_key is None else legacy_key
+        self._keys = []
+        self._signature = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def authorize(self, authorization, project):
+        """
+        Return the name of the key in the "Bearer <key>" authorization header if it
+        may access project, otherwise None. Every stored hash is compared, in constant time.
+        """
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme != "Bearer" or not token:
+            return None
+        digest = hash_key(token.strip()).encode("ascii")
+        allowed = None
+        for key in self._current_keys():
+            # No early exit: the time taken does not depend on which key matched
+            if hmac.compare_digest(key.digest, digest) and key.allows(project) and allowed is None:
+                allowed = key.name
+        return allowed
+
+    def _current_keys(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < RELOAD_INTERVAL:
+            return self._keys
+        with self._lock:
+            if self._checked_at is None or now - self._checked_at >= RELOAD_INTERVAL:
+                signature = FileHandler.stat_signature(self.keys_file) if self.keys_file else None
+                if self._checked_at is None or signature != self._signature:
+                    self._keys = self._load(signature)
+                    self._signature = signature
+                self._checked_at = now
+        return self._keys
+
+    def _load(self, signature):
+        keys = []
+        if self.legacy_key:
+            keys.append(ApiKey("default", hash_key(self.legacy_key).encode("ascii"), ["*"]))
+        if signature is not None:
+            try:
+                with open(self.keys_file, "r", encoding="utf-8") as f:
+                    entries = json.load(f).get("keys", [])
+                for i, entry in enumerate(entries):
+                    digest = entry["hash"]
+                    if not digest.startswith("sha256:"):
+                        raise ValueError(f"key {entry.get('name', i)} must be a sha256: hash")
+                    keys.append(ApiKey(entry.get("name", f"key{i}"), digest.lower().encode("ascii"),
+                                       entry.get("projects", ["*"])))
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                # Keep the previous table rather than locking everybody out
+                logger.error("Could not load API keys from %s: %s", self.keys_file, e)
+                return self._keys or keys
+        logger.info("Loaded %s API key(s)", len(keys))
+        return keys
+
+auth_table = AuthTable()
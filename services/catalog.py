@@ -0,0 +1,75 @@
+# services/catalog.py
+"""
+@file services/catalog.py
+@brief Builds component and documentation catalogs (identifier -> files) from a
+       single scan, so listing and lookup no longer rescan and re-slugify the tree.
+"""
+import slugify
+
+class Catalog:
+    def __init__(self, identifiers, files, all_files):
+        """
+        identifiers: identifiers in listing order (as returned by the list endpoints)
+        files: dict of identifier -> list of file paths
+        all_files: every scanned file before identifier filtering
+        """
+        self.identifiers = identifiers
+        self.files = files
+        self.all_files = all_files
+
+    def get(self, identifier):
+        return self.files.get(identifier, [])
+
+def make_identifier(name, identifier_mode):
+    return slugify.slugify(name) if identifier_mode == "slugify" else name
+
+def build_component_catalog(entries, settings):
+    """
+    Group scanned component entries by identifier for every index_by/file_groups mode.
+    settings is the dict returned by ProjectService.get_component_settings().
+    """
+    file_extension = settings["file_extension"]
+    identifier_mode = settings["identifier"]
+    filtered = [e for e in entries if e.ext in file_extension]
+    all_files = [e.path for e in entries]
+
+    if settings["index_by"] == "folder":
+        # Group by folder
+        folders = {}
+        for e in filtered:
+            folder = e.relpath.split("/")[0]
+            folders.setdefault(folder, []).append(e.path)
+        identifiers = [make_identifier(k, identifier_mode) for k in folders]
+        files = {}
+        for key, (_, paths) in zip(identifiers, folders.items()):
+            files[key] = paths
+        return Catalog(identifiers, files, all_files)
+
+    # index by file: files sharing a base name form one component
+    files = {}
+    identifiers = []
+    slugs = {}
+    for e in filtered:
+        key = slugs.get(e.stem)
+        if key is None:
+            key = slugs[e.stem] = make_identifier(e.stem, identifier_mode)
+        if settings["file_groups"]:
+            if key not in files:
+                identifiers.append(key)
+        else:
+            # return every file as a component
+            identifiers.append(key)
+        files.setdefault(key, []).append(e.path)
+    return Catalog(identifiers, files, all_files)
+
+def build_doc_catalog(entries, identifier_mode):
+    """Map markdown documentation files to identifiers."""
+    identifiers = []
+    files = {}
+    for e in entries:
+        if e.ext != "md":
+            continue
+        doc_id = make_identifier(e.stem, identifier_mode)
+        identifiers.append(doc_id)
+        files[doc_id] = [e.path]
+    return Catalog(identifiers, files, [e.path for e in entries])
@@ -0,0 +1,130 @@
+# services/context_pack.py
+"""
+@file services/context_pack.py
+@brief Assembles a bundle of project files that fits a character / approximate
+       token budget. Files are ordered by configurable priority rules, large files
+       are cut down to their head, and files that no longer fit are listed without
+       ever being read.
+"""
+import math
+import os
+from config import Config
+from logger import get_logger
+from utils.file_handler import FileHandler
+from utils.glob_matcher import compile_patterns
+
+logger = get_logger(__name__)
+
+# Below this many characters a truncated file is not worth including
+MIN_TRUNCATED_CHARS = 256
+# Characters charged per file for its heading / code fence
+FILE_OVERHEAD_CHARS = 32
+
+class ContextPack:
+    def __init__(self, root, max_chars, max_file_chars=0, rules=(), chars_per_token=None):
+        """
+        root: project root, file paths are matched against rules relative to it
+        max_chars: total budget for file contents (including per-file overhead)
+        max_file_chars: files longer than this are truncated even if they would fit (0 = no limit)
+        rules: [{"pattern": glob, "priority": int}], files matching higher priorities come first
+        """
+        self.root = root
+        self.max_chars = max_chars
+        self.max_file_chars = max_file_chars
+        self.chars_per_token = chars_per_token or Config.CONTEXT_CHARS_PER_TOKEN
+        self.rules = [(compile_patterns([r["pattern"]]), int(r.get("priority", 0))) for r in rules if r.get("pattern")]
+        self.files = []
+        self.omitted = []
+        self.errors = []
+        self.used_chars = 0
+
+    def tokens(self, chars):
+        return math.ceil(chars / self.chars_per_token)
+
+    def priority(self, path):
+        relpath = os.path.relpath(path, self.root).replace(os.sep, "/")
+        return max((priority for matcher, priority in self.rules if matcher.matches(relpath)), default=0)
+
+    def build(self, paths):
+        """
+        Fill the pack from paths (in request order, duplicates ignored). Only files that
+        are (partly) included are read; the rest are stat'ed only.
+        """
+        paths = list(dict.fromkeys(paths))
+        # Stable sort: request order is kept within one priority
+        ordered = sorted(paths, key=self.priority, reverse=True)
+        for path in ordered:
+            self._add(path, self.max_chars - self.used_chars - FILE_OVERHEAD_CHARS)
+        logger.debug("Context pack: %s files, %s omitted, %s/%s chars",
+                     len(self.files), len(self.omitted), self.used_chars, self.max_chars)
+        return self
+
+    def _add(self, path, remaining):
+        signature = FileHandler.stat_signature(path, regular_only=True)
+        if signature is None:
+            self.errors.append({"path": path, "message": "Not found"})
+            return
+        size = signature[1]
+        limit = remaining
+        if self.max_file_chars:
+            limit = min(limit, self.max_file_chars)
+        # Files that fit are added whole however little budget is left; only a cut
+        # file must keep at least MIN_TRUNCATED_CHARS to be worth including
+        if size > limit and limit < MIN_TRUNCATED_CHARS:
+            self.omitted.append({"path": path, "tokens": self.tokens(size)})
+            return
+        try:
+            content, truncated = FileHandler.read_file_head(path, limit)
+        except (OSError, UnicodeDecodeError) as e:
+            self.errors.append({"path": path, "message": str(e)})
+            return
+        if content is None:
+            self.errors.append({"path": path, "message": "Not found"})
+            return
+        if truncated:
+            # Prefer to end on a line boundary
+            cut = content.rfind("\n")
+            if cut > len(content) // 2:
+                content = content[:cut + 1]
+        self.used_chars += len(content) + FILE_OVERHEAD_CHARS
+        self.files.append({
+            "path": path,
+            "tokens": self.tokens(len(content)),
+            "truncated": truncated,
+            "total_tokens": self.tokens(size),
+            "content": content,
+        })
+
+    def to_dict(self):
+        return {
+            "budget": {"tokens": self.tokens(self.max_chars), "used_tokens": self.tokens(self.used_chars)},
+            "files": self.files,
+            "omitted": self.omitted,
+            "errors": self.errors,
+        }
+
+    def to_markdown(self, title):
+        md = [f"# Context: {title}\n",
+              f"_~{self.tokens(self.used_chars)} of {self.tokens(self.max_chars)} tokens used_\n"]
+        for f in self.files:
+            relpath = os.path.relpath(f["path"], self.root)
+            ext = os.path.splitext(f["path"])[1].lstrip(".")
+            md.append(f"\n## {relpath}\n```{ext}\n{f['content']}\n```\n")
+            if f["truncated"]:
+                md.append(f"_Truncated: {f['tokens']} of ~{f['total_tokens']} tokens shown._\n")
+        if self.omitted:
+            md.append("\n# Omitted\n")
+            md.extend(f"- {os.path.relpath(f['path'], self.root)}\n" for f in self.omitted)
+        if self.errors:
+            md.append("\n# Errors\n")
+            md.extend(f"- {self._error_label(e)}: {e['message']}\n" for e in self.errors)
+        return "".join(md)
+
+    def _error_label(self, error):
+        # File errors carry a path, unresolved resource references carry the request item
+        if "path" in error:
+            return os.path.relpath(error["path"], self.root)
+        resource = error.get("resource")
+        if isinstance(resource, dict):
+            return f"{resource.get('type', '')}:{resource.get('id') or ''}".rstrip(":")
+        return str(resource)
@@ -0,0 +1,153 @@
+# services/manifest.py
+"""
+@file services/manifest.py
+@brief Precomputed project manifests: categorised file lists, module files,
+       component/doc catalogs, styles and content hashes built ahead of time (see
+       build_manifest.py). A project whose meta and config files still hash to
+       the values recorded in the manifest is served from it without scanning.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from config import Config
+from logger import get_logger
+from services.catalog import Catalog
+
+logger = get_logger(__name__)
+
+# Bump when the manifest layout changes
+MANIFEST_FORMAT = 1
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def file_hash(path):
+    """blake2b digest of a file's bytes, or None if it cannot be read."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def _catalog_dict(catalog):
+    return {"identifiers": catalog.identifiers, "files": catalog.files, "all_files": catalog.all_files}
+
+def build_project_manifest(svc, hashes=True):
+    """Compute the manifest entry of one loaded ProjectService."""
+    files_by_category = svc.get_project_files_by_category()
+    modules = {m: svc.get_module_files(m) for m in svc.get_all_modules()}
+    components = svc.get_component_catalog()
+    docs = svc.get_doc_catalog()
+    entry = {
+        "root": os.path.abspath(svc.project_path),
+        "meta_hash": svc.meta_hash,
+        "config_hash": svc.config_hash,
+        "files_by_category": files_by_category,
+        "config_files": files_by_category["config"],
+        "modules": modules,
+        "components": _catalog_dict(components),
+        "docs": _catalog_dict(docs),
+        "styles": svc.get_project_styles(),
+        "hashes": {},
+    }
+    if hashes:
+        paths = set()
+        for files in list(files_by_category.values()) + list(modules.values()):
+            paths.update(files)
+        paths.update(docs.all_files)
+        entry["hashes"] = {p: file_hash(p) for p in sorted(paths)}
+    return entry
+
+def write_manifest(path, projects):
+    """Atomically write a manifest holding the given {project name: entry} mapping."""
+    data = {"format": MANIFEST_FORMAT, "built_at": time.time(), "projects": projects}
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def read_manifest(path):
+    """
+    Return the {project name: entry} mapping stored at path, or {} when there is no
+    manifest or it was written in another format. Raises OSError / ValueError.
+    """
+    if not path or not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != MANIFEST_FORMAT:
+        logger.warning("Ignoring manifest %s with format %s", path, data.get("format"))
+        return {}
+    return data["projects"]
+
+class ProjectManifest:
+    """Manifest entry of one project, with its catalogs rebuilt as Catalog objects."""
+    def __init__(self, entry):
+        self.root = entry["root"]
+        self.meta_hash = entry["meta_hash"]
+        self.config_hash = entry["config_hash"]
+        self.files_by_category = entry["files_by_category"]
+        self.config_files = entry["config_files"]
+        self.modules = entry["modules"]
+        self.components = Catalog(**entry["components"])
+        self.docs = Catalog(**entry["docs"])
+        self.styles = entry["styles"]
+        self.hashes = entry["hashes"]
+
+    def directories(self):
+        """Directories holding the files recorded in this entry."""
+        files = set(self.config_files) | set(self.components.all_files) | set(self.docs.all_files)
+        for group in list(self.files_by_category.values()) + list(self.modules.values()):
+            files.update(group)
+        return {os.path.dirname(f) for f in files}
+
+class ManifestStore:
+    def __init__(self, path=None):
+        self.path = Config.MANIFEST_PATH if path is None else path
+        self._projects = None
+        self._lock = threading.Lock()
+
+    def get(self, project_name, root, meta_hash, config_hash):
+        """
+        Return the ProjectManifest for project_name if the manifest has one built from
+        the same root, meta file and config file, otherwise None.
+        """
+        entry = self._load().get(project_name)
+        if entry is None:
+            return None
+        if (entry.root, entry.meta_hash, entry.config_hash) != (os.path.abspath(root), meta_hash, config_hash):
+            logger.warning("Manifest entry for %s is outdated, scanning instead", project_name)
+            return None
+        return entry
+
+    def _load(self):
+        if self._projects is not None:
+            return self._projects
+        with self._lock:
+            if self._projects is None:
+                self._projects = self._read()
+        return self._projects
+
+    def _read(self):
+        try:
+            projects = {name: ProjectManifest(entry) for name, entry in read_manifest(self.path).items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("Could not load manifest %s: %s", self.path, e)
+            return {}
+        if projects:
+            logger.info("Loaded manifest %s with %s project(s)", self.path, len(projects))
+        return projects
+
+manifest_store = ManifestStore()
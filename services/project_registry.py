@@ -0,0 +1,122 @@
+# services/project_registry.py
+"""
+@file services/project_registry.py
+@brief Process-wide registry keeping one loaded ProjectService per project.
+       Configs are only re-read when the meta/config files change on disk and
+       the number of resident projects is bounded by an LRU.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from config import Config
+from logger import get_logger
+from services.project_service import ProjectService
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+class ProjectRegistry:
+    def __init__(self, max_projects=None):
+        self.max_projects = max_projects or Config.PROJECT_CACHE_SIZE
+        self._services = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, project_name):
+        """
+        Return the cached ProjectService for project_name, loading it on first use
+        and reloading its configs when their mtime/size changed.
+        """
+        with self._lock:
+            svc = self._services.get(project_name)
+            if svc is not None:
+                self._services.move_to_end(project_name)
+
+        if svc is None:
+            loaded = ProjectService(project_name)
+            with self._lock:
+                # Another thread may have loaded it meanwhile; keep the first one
+                svc = self._services.setdefault(project_name, loaded)
+                self._services.move_to_end(project_name)
+                self._evict()
+            if svc is not loaded:
+                loaded.close()
+            return svc
+
+        try:
+            if svc.reload_if_stale():
+                logger.debug("Reloaded config for project %s", project_name)
+        except FileNotFoundError:
+            self.invalidate(project_name)
+            raise
+        return svc
+
+    def invalidate(self, project_name=None):
+        """Drop one project (or all projects when project_name is None) from the registry."""
+        with self._lock:
+            if project_name is None:
+                dropped = list(self._services.values())
+                self._services.clear()
+            else:
+                dropped = [self._services.pop(project_name, None)]
+        for svc in dropped:
+            if svc is not None:
+                svc.close()
+
+    def warm(self, project_names=None):
+        """
+        Load projects (all *.json metas in PROJECTS_DIR by default, up to the registry size)
+        and build their file indexes and catalogs, so the first requests are served warm.
+        Returns the names of the projects that were loaded.
+        """
+        if project_names is None:
+            try:
+                metas = sorted(os.listdir(Config.PROJECTS_DIR))
+            except OSError as e:
+                logger.warning("Cannot list projects in %s: %s", Config.PROJECTS_DIR, e)
+                return []
+            project_names = [m[:-len(".json")] for m in metas if m.endswith(".json")]
+
+        warmed = []
+        for name in project_names[:self.max_projects]:
+            try:
+                svc = self.get(name)
+                svc.get_project_files_by_category()
+                for module in svc.get_all_modules():
+                    svc.get_module_files(module)
+                svc.get_documentation_list()
+                warmed.append(name)
+            except Exception as e:
+                logger.warning("Could not preload project %s: %s", name, e)
+        logger.info("Preloaded %s project(s)", len(warmed))
+        return warmed
+
+    def save_snapshots(self):
+        """Write an index snapshot for every loaded project (see ProjectService.save_snapshot)."""
+        with self._lock:
+            services = list(self._services.values())
+        saved = sum(1 for svc in services if svc.save_snapshot())
+        logger.info("Saved index snapshots for %s project(s)", saved)
+        return saved
+
+    def attach_watcher(self):
+        """Subscribe every loaded project to the file watcher (after it was started late)."""
+        with self._lock:
+            services = list(self._services.values())
+        for svc in services:
+            svc.attach_watcher()
+
+    def projects(self):
+        """Return the names of the currently loaded projects."""
+        with self._lock:
+            return list(self._services.keys())
+
+    def _evict(self):
+        while len(self._services) > self.max_projects:
+            name, svc = self._services.popitem(last=False)
+            svc.close()
+            logger.debug("Evicted project %s from registry", name)
+
+registry = ProjectRegistry()
+
+metrics.register_collector("projects_loaded", "Projects resident in the registry", lambda: {(): len(registry.projects())})
@@ -7,34 +7,31 @@
 
 import os
 import json
+import threading
 import json5
-import slugify
+from config import Config
 from logger import get_logger
+from services.search_index import SearchIndex
+from services.auth import auth_table
+from services.manifest import manifest_store, text_hash
+from services.catalog import Catalog, build_component_catalog, build_doc_catalog
 from utils.file_handler import FileHandler
+from utils.content_cache import content_cache
+from utils.file_index import FileIndex
+from utils.index_snapshot import snapshot_path, save_snapshot, load_snapshot
+from utils.metrics import timed
+from utils.pagination import SortedListing
+from utils.single_flight import coalesced
+from utils.tree_walk import DirListing
+from utils.watcher import watcher, CREATED, DELETED, OVERFLOW
 
 logger = get_logger(__name__)
 
-class ProjectService:
-    def __init__(self, project_name):
-        """
-        Load project config from ./projects/{project_name}.json and project.config.json5
-        """
-        self.project_name = project_name
-        self.project_meta_path = os.path.join(".", "projects", f"{project_name}.json")
-        
-        if not os.path.isfile(self.project_meta_path):
-            raise FileNotFoundError(f"Project meta file {self.project_meta_path} not found.")
+# Memo keys (or tuple key prefixes) whose values are plain data worth persisting;
+# scanned FileEntry lists carry live stat data and are rebuilt instead
+PERSISTED_MEMOS = ("components", "docs", "module")
 
-        with open(self.project_meta_path, "r", encoding="utf-8") as f:
-            self.project_meta = json.load(f)
-
-        self.project_path = self.project_meta.get("project_path")
-        if not self.project_path or not os.path.isdir(self.project_path):
-            raise FileNotFoundError(f"Project path {self.project_path} not found.")
-
-        # Load or create project.config.json5
-        self.project_config_path = os.path.join(self.project_path, "project.config.json5")
-        default_config = """{
+DEFAULT_PROJECT_CONFIG = """{
     // Default project config
     "info": {
         "title": "Project Title",
@@ -57,21 +54,222 @@ class ProjectService:
     "docs": {}
 }
 """
-        FileHandler.ensure_json5_file(self.project_config_path, default_config)
-        with open(self.project_config_path, "r", encoding="utf-8") as f:
-            self.project_config = json5.load(f)
 
-        self.exclude_patterns = self.project_meta.get("exclude", [])
-        self.docs_path = self.project_meta.get("docs_path", "./docs")
+def _encode_memo_value(value):
+    if isinstance(value, Catalog):
+        return {"catalog": {"identifiers": value.identifiers, "files": value.files, "all_files": value.all_files}}
+    return {"files": value}
+
+def _decode_memo_value(data):
+    if "catalog" in data:
+        catalog = data["catalog"]
+        return Catalog(list(catalog["identifiers"]), dict(catalog["files"]), list(catalog["all_files"]))
+    return list(data["files"])
+
+class ProjectService:
+    def __init__(self, project_name):
+        """
+        Load project config from ./projects/{project_name}.json and project.config.json5
+        """
+        self.project_name = project_name
+        self.project_meta_path = os.path.join(Config.PROJECTS_DIR, f"{project_name}.json")
+        self.config_version = 0
+        self.file_index = None
+        self.manifest = None
+        # Set on the first watcher event for the tree; the manifest is never re-attached after it
+        self.tree_changed = False
+        self.watched = False
+        self._config_dirty = False
+        self._memo = {}
+        self._listings = {}
+        self._search_index = None
+        self._search_lock = threading.Lock()
+        self._meta_signature = None
+        self._config_signature = None
+        self.reload()
+
+    def reload(self):
+        """
+        (Re)load the project meta file and project.config.json5 and bump config_version.
+        """
+        if not os.path.isfile(self.project_meta_path):
+            raise FileNotFoundError(f"Project meta file {self.project_meta_path} not found.")
+
+        meta_signature = FileHandler.stat_signature(self.project_meta_path)
+        with open(self.project_meta_path, "r", encoding="utf-8") as f:
+            meta_text = f.read()
+        project_meta = json.loads(meta_text)
+
+        project_path = project_meta.get("project_path")
+        if not project_path or not os.path.isdir(project_path):
+            raise FileNotFoundError(f"Project path {project_path} not found.")
+
+        # Load or create project.config.json5
+        project_config_path = os.path.join(project_path, "project.config.json5")
+        FileHandler.ensure_json5_file(project_config_path, DEFAULT_PROJECT_CONFIG)
+        config_signature = FileHandler.stat_signature(project_config_path)
+        with open(project_config_path, "r", encoding="utf-8") as f:
+            config_text = f.read()
+        project_config = json5.loads(config_text)
+
+        docs_path = project_meta.get("docs_path", "./docs")
         # docs_path might be relative to project_path
-        if not os.path.isabs(self.docs_path):
-            self.docs_path = os.path.join(self.project_path, self.docs_path)
+        if not os.path.isabs(docs_path):
+            docs_path = os.path.join(project_path, docs_path)
+
+        new_index = self.file_index is None or self.file_index.root != os.path.abspath(project_path)
+        if new_index:
+            if self.file_index is not None:
+                watcher.unwatch_owner(self)
+            self.file_index = FileIndex(project_path)
+
+        self.project_meta = project_meta
+        self.project_path = project_path
+        self.project_config_path = project_config_path
+        self.project_config = project_config
+        self.exclude_patterns = project_meta.get("exclude", [])
+        self.follow_symlinks = bool(project_meta.get("follow_symlinks", False))
+        # Parallel scanning is opt-in per project (useful for network mounted trees)
+        self.scan_workers = 0
+        if project_meta.get("parallel_scan", False):
+            self.scan_workers = int(project_meta.get("scan_workers", Config.SCAN_WORKERS))
+        self.docs_path = docs_path
+        self._meta_signature = meta_signature
+        self._config_signature = config_signature
+        self.meta_hash = text_hash(meta_text)
+        self.config_hash = text_hash(config_text)
+        # Served instead of scanning while the tree is unchanged (see build_manifest.py)
+        self.manifest = None
+        if not self.tree_changed:
+            self.manifest = manifest_store.get(self.project_name, project_path, self.meta_hash, self.config_hash)
+        self.config_version += 1
+        if new_index:
+            self.load_snapshot()
+        self.attach_watcher()
+        logger.debug("Loaded project %s (config version %s)", self.project_name, self.config_version)
+
+    def close(self):
+        """Stop receiving watcher events (called when the registry drops this service)."""
+        watcher.unwatch_owner(self)
+        self.watched = False
+        if self.file_index is not None:
+            self.file_index.watcher = None
+            self.file_index.on_listed = None
+
+    def attach_watcher(self):
+        """Let the file watcher push invalidations for the tree and config files, if it runs."""
+        if not watcher.running:
+            return
+        index = self.file_index
+        index.watcher = watcher
+        index.on_listed = lambda path, listing: watcher.watch_dir(path, self._on_tree_event, self, listing.mtime_ns)
+        # Directories listed before the watcher started (e.g. preloaded before a fork)
+        index.replay_listed()
+        watcher.watch_file(self.project_meta_path, self._on_config_event, self)
+        watcher.watch_file(self.project_config_path, self._on_config_event, self)
+        self.watched = True
+        if self.manifest is not None:
+            # Listings are served from the manifest, so nothing lists (and thereby watches)
+            # the tree; list it once in the background so changes drop the manifest
+            threading.Thread(target=self._watch_manifest_tree, args=(self.manifest,),
+                             name=f"manifest-watch-{self.project_name}", daemon=True).start()
+
+    def _watch_manifest_tree(self, manifest):
+        try:
+            self.scan_entries(self.project_path, excludes=self.exclude_patterns)
+            directories = set()
+            for directory in manifest.directories():
+                # Ancestors too: creating a sibling directory must be noticed
+                while self.file_index.covers(directory) and directory not in directories:
+                    directories.add(directory)
+                    directory = os.path.dirname(directory)
+            for directory in directories:
+                self.file_index.listing(directory)
+        except Exception as e:
+            logger.error("Could not watch the tree of project %s: %s", self.project_name, e)
+
+    def _on_tree_event(self, directory, name, kind):
+        self.tree_changed = True
+        if self.manifest is not None:
+            logger.info("Tree of project %s changed, no longer serving it from the manifest", self.project_name)
+            self.manifest = None
+        if kind == OVERFLOW:
+            self.file_index.invalidate()
+            content_cache.invalidate()
+            self._config_dirty = True
+            return
+        if name is None:
+            # Directory changed (polling) or itself went away
+            self.file_index.invalidate(directory, recursive=kind == DELETED)
+            return
+        path = os.path.join(directory, name)
+        if kind in (CREATED, DELETED):
+            self.file_index.invalidate(directory, recursive=False)
+            self.file_index.invalidate(path)
+        content_cache.invalidate(path)
+        if self._search_index is not None:
+            self._search_index.mark_dirty(path)
+
+    def _on_config_event(self, directory, name, kind):
+        self._config_dirty = True
+
+    def is_stale(self):
+        """Return True when the meta file or project.config.json5 changed since the last load."""
+        return (FileHandler.stat_signature(self.project_meta_path) != self._meta_signature
+                or FileHandler.stat_signature(self.project_config_path) != self._config_signature)
+
+    @property
+    def config_signature(self):
+        """Signature of the loaded meta and config files; stable across processes."""
+        return (self._meta_signature, self._config_signature)
+
+    def reload_if_stale(self):
+        """Reload the configs if they changed on disk. Returns True when a reload happened."""
+        if self.watched and watcher.running:
+            # The watcher flags changes; skip the stat calls until it does
+            if not self._config_dirty:
+                return False
+            self._config_dirty = False
+        if not self.is_stale():
+            return False
+        self.reload()
+        return True
+
+    def scan_entries(self, base, includes=None, excludes=None, visited=None):
+        """
+        Scan base through the project's file index and return a list of FileEntry.
+        If visited is a list, the scanned directories are appended to it. When base
+        does not exist, its nearest existing ancestor is recorded instead, so that
+        creating base invalidates results memoized on visited.
+        """
+        start = len(visited) if visited is not None else 0
+        entries = list(FileHandler.iter_entries(base, includes, excludes, index=self.file_index,
+                                                follow_symlinks=self.follow_symlinks,
+                                                workers=self.scan_workers, visited=visited))
+        if visited is not None and len(visited) == start:
+            visited.append(self._nearest_listed_ancestor(base))
+        return entries
+
+    def _nearest_listed_ancestor(self, path):
+        """Closest indexed directory at or above path that exists, else path itself."""
+        current = os.path.abspath(path)
+        while self.file_index.covers(current):
+            if self.file_index.listing(current) is not None:
+                return current
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+        # Not indexed: a snapshot of it never validates, so nothing is cached on it
+        return path
+
+    def scan_files(self, base, includes=None, excludes=None):
+        """Scan base through the project's file index and return a list of file paths."""
+        return [e.path for e in self.scan_entries(base, includes, excludes)]
 
     def authenticate(self, token: str):
-        # Check token against API_KEY from env
-        from config import Config
-        logger.debug("Authenticating request")
-        return token == f"Bearer {Config.API_KEY}"
+        """Check a "Bearer <key>" header against the keys allowed for this project."""
+        return auth_table.authorize(token, self.project_name) is not None
 
     def get_project_info(self):
         logger.debug("Fetching project info")
@@ -85,22 +283,31 @@ class ProjectService:
         stack = self.project_config.get("stack", [])
         return stack
 
+    def get_config_file_path(self, key):
+        """Resolve a file path setting (e.g. "spec", "tasks") relative to project_path."""
+        path = self.project_config.get(key)
+        if not path:
+            return None
+        if not os.path.isabs(path):
+            path = os.path.join(self.project_path, path)
+        return path
+
+    @timed
+    @coalesced
     def get_project_spec(self):
         logger.debug("Fetching project spec")
-        spec_path = self.project_config.get("spec")
+        spec_path = self.get_config_file_path("spec")
         if spec_path:
-            if not os.path.isabs(spec_path):
-                spec_path = os.path.join(self.project_path, spec_path)
             content = FileHandler.read_file(spec_path)
             return {"specification": content if content else ""}
         return {"specification": ""}
 
+    @timed
+    @coalesced
     def get_project_tasks(self):
         logger.debug("Fetching project tasks")
-        tasks_path = self.project_config.get("tasks")
+        tasks_path = self.get_config_file_path("tasks")
         if tasks_path:
-            if not os.path.isabs(tasks_path):
-                tasks_path = os.path.join(self.project_path, tasks_path)
             content = FileHandler.read_file(tasks_path)
             if content:
                 # Return as list of tasks (each line as a task for demonstration)
@@ -108,18 +315,29 @@ class ProjectService:
                 return lines
         return []
 
+    @timed
+    @coalesced
     def get_project_config_files(self):
         logger.debug("Fetching project config files")
+        if self.manifest is not None:
+            return self.manifest.config_files
+        includes, excludes = self.get_config_file_patterns()
+        # If needed, we can consider base for config. For now assume project_path root.
+        files = self.scan_files(self.project_path, includes, excludes)
+        return files
+
+    def get_config_file_patterns(self):
+        """Include and exclude patterns of the config section of project.config.json5."""
         config_info = self.project_config.get("config", {})
         includes = config_info.get("include", [])
         excludes = config_info.get("exclude", [])
         if isinstance(includes, dict):
             # If structured similarly to modules, handle that
             includes = includes.get("include", [])
-        # If needed, we can consider base for config. For now assume project_path root.
-        files = FileHandler.scan_files(self.project_path, includes, excludes)
-        return files
+        return includes, excludes
 
+    @timed
+    @coalesced
     def get_project_files_by_category(self):
         """
         Return files in categories: core, config, components, admin, auth, schemas.
@@ -132,37 +350,49 @@ class ProjectService:
         - schemas: *schema* in filename
         """
         logger.debug("Fetching project files by category")
-        core = FileHandler.scan_files(self.project_path, excludes=self.exclude_patterns)
+        if self.manifest is not None:
+            return self.manifest.files_by_category
         # Filter categories by pattern
         def filter_by_pattern(files, pattern):
             return [f for f in files if pattern in os.path.basename(f).lower()]
 
-        config_files = self.get_project_config_files()
-        components = self.get_all_components_files()
-        admin = filter_by_pattern(core, "admin")
-        auth = filter_by_pattern(core, "auth")
-        schemas = filter_by_pattern(core, "schema")
-
-        # core: remove the admin/auth/schema files to avoid duplication
-        used = set(admin+auth+schemas+config_files+components)
-        core = [f for f in core if f not in used]
-
-        return {
-            "core": core,
-            "config": config_files,
-            "components": components,
-            "admin": admin,
-            "auth": auth,
-            "schemas": schemas
-        }
+        def build(visited):
+            core = [e.path for e in self.scan_entries(self.project_path, excludes=self.exclude_patterns,
+                                                      visited=visited)]
+            includes, excludes = self.get_config_file_patterns()
+            config_files = [e.path for e in self.scan_entries(self.project_path, includes, excludes, visited)]
+            components = self.get_all_components_files()
+            # The component catalog is memoized on its own directories; depend on them too
+            visited.extend(path for path, _ in self._memo.get("components", (None, [], None))[1])
+            admin = filter_by_pattern(core, "admin")
+            auth = filter_by_pattern(core, "auth")
+            schemas = filter_by_pattern(core, "schema")
+
+            # core: remove the admin/auth/schema files to avoid duplication
+            used = set(admin+auth+schemas+config_files+components)
+            core = [f for f in core if f not in used]
+
+            return {
+                "core": core,
+                "config": config_files,
+                "components": components,
+                "admin": admin,
+                "auth": auth,
+                "schemas": schemas
+            }
+        return self._memoized("categories", build)
 
     def get_all_modules(self):
         logger.debug("Fetching modules")
         modules = self.project_config.get("modules", {})
         return list(modules.keys())
 
+    @timed
+    @coalesced
     def get_module_files(self, identifier):
-        logger.debug(f"Fetching files for module {identifier}")
+        logger.debug("Fetching files for module %s", identifier)
+        if self.manifest is not None:
+            return self.manifest.modules.get(identifier, [])
         modules = self.project_config.get("modules", {})
         if identifier not in modules:
             return []
@@ -172,220 +402,301 @@ class ProjectService:
             base = os.path.join(self.project_path, base)
         includes = mod.get("include", [])
         excludes = mod.get("exclude", [])
-        files = FileHandler.scan_files(base, includes, excludes)
-        return files
+        return self._memoized(("module", identifier),
+                              lambda visited: [e.path for e in self.scan_entries(base, includes, excludes, visited)])
 
-    def get_all_components(self):
-        logger.debug("Fetching all components")
+    def resolve_resource(self, kind, identifier=None):
+        """
+        Return the files behind a resource reference used by batch requests:
+        component/<id>, module/<id>, doc/<id>, spec or tasks.
+        Raises ValueError for unknown resource kinds.
+        """
+        if kind == "component":
+            return self.get_component_files(identifier)
+        if kind == "module":
+            return self.get_module_files(identifier)
+        if kind in ("doc", "docs"):
+            path = self.get_documentation_path(identifier)
+            return [path] if path else []
+        if kind in ("spec", "tasks"):
+            path = self.get_config_file_path(kind)
+            return [path] if path and os.path.isfile(path) else []
+        raise ValueError(f"Unknown resource type {kind}")
+
+    def get_component_settings(self):
+        """Normalised components section of project.config.json5, or None if no base is set."""
         comp = self.project_config.get("components", {})
         base = comp.get("base", "")
-        index_by = comp.get("index_by", "file")
-        file_groups = comp.get("file_groups", False)
-        file_extension = comp.get("file_extension", "").split(",")
-        identifier_mode = comp.get("identifier", "slugify")
-
         if not base:
-            return []
-
+            return None
         if not os.path.isabs(base):
             base = os.path.join(self.project_path, base.lstrip("/."))
 
         includes = comp.get("include", {})
         if isinstance(includes, dict):
             includes = includes.get("include", [])
-        excludes = comp.get("exclude", {} )
+        excludes = comp.get("exclude", {})
         if isinstance(excludes, dict):
             excludes = excludes.get("exclude", [])
 
-        files = FileHandler.scan_files(base, includes, excludes)
-
-        # Filter by extension
-        filtered = []
-        for f in files:
-            ext = os.path.splitext(f)[1].lstrip(".")
-            if ext in file_extension:
-                filtered.append(f)
-
-        if index_by == "folder":
-            # Group by folder
-            folders = {}
-            for f in filtered:
-                rel = os.path.relpath(f, base)
-                folder = rel.split(os.sep)[0]
-                folders.setdefault(folder, []).append(f)
-            if identifier_mode == "slugify":
-                return [slugify.slugify(k) for k in folders.keys()]
-            else:
-                return list(folders.keys())
-        else:
-            # index by file
-            if file_groups:
-                # Group files by base name
-                groups = {}
-                for f in filtered:
-                    fname = os.path.splitext(os.path.basename(f))[0]
-                    groups.setdefault(fname, []).append(f)
-                if identifier_mode == "slugify":
-                    return [slugify.slugify(k) for k in groups.keys()]
-                else:
-                    return list(groups.keys())
-            else:
-                # return every file as a component
-                comps = []
-                for f in filtered:
-                    name = os.path.splitext(os.path.basename(f))[0]
-                    if identifier_mode == "slugify":
-                        name = slugify.slugify(name)
-                    comps.append(name)
-                return comps
-
-    def get_component_files(self, identifier):
-        logger.debug(f"Fetching files for component {identifier}")
-        # Re-run logic of get_all_components but keep the grouping for actual files
-        comp = self.project_config.get("components", {})
-        base = comp.get("base", "")
-        index_by = comp.get("index_by", "file")
-        file_groups = comp.get("file_groups", False)
-        file_extension = comp.get("file_extension", "").split(",")
-        identifier_mode = comp.get("identifier", "slugify")
+        return {
+            "base": base,
+            "include": includes,
+            "exclude": excludes,
+            "index_by": comp.get("index_by", "file"),
+            "file_groups": comp.get("file_groups", False),
+            "file_extension": comp.get("file_extension", "").split(","),
+            "identifier": comp.get("identifier", "slugify"),
+        }
 
+    def get_doc_settings(self):
+        """Normalised docs section of project.config.json5, or None if no base is set."""
+        docs = self.project_config.get("docs", {})
+        base = docs.get("base", "")
         if not base:
-            return []
-
+            return None
         if not os.path.isabs(base):
             base = os.path.join(self.project_path, base.lstrip("/."))
+        return {
+            "base": base,
+            "include": docs.get("include", []),
+            "exclude": docs.get("exclude", []),
+            "identifier": docs.get("identifier", "slugify"),
+        }
 
-        includes = comp.get("include", {})
-        if isinstance(includes, dict):
-            includes = includes.get("include", [])
-        excludes = comp.get("exclude", {})
-        if isinstance(excludes, dict):
-            excludes = excludes.get("exclude", [])
+    def get_context_settings(self):
+        """Normalised context section of project.config.json5 (priority rules for context packs)."""
+        ctx = self.project_config.get("context", {})
+        return {
+            "priority": ctx.get("priority", []),
+            "max_file_tokens": int(ctx.get("max_file_tokens", 0)),
+        }
+
+    @timed
+    @coalesced
+    def get_component_catalog(self):
+        """
+        Return the component Catalog, rebuilt only when the config or one of the
+        scanned directories changed.
+        """
+        if self.manifest is not None:
+            return self.manifest.components
+        def build(visited):
+            settings = self.get_component_settings()
+            if settings is None:
+                return Catalog([], {}, [])
+            entries = self.scan_entries(settings["base"], settings["include"], settings["exclude"], visited)
+            return build_component_catalog(entries, settings)
+        return self._memoized("components", build)
+
+    @timed
+    @coalesced
+    def get_doc_catalog(self):
+        """Return the documentation Catalog, rebuilt only when the config or docs tree changed."""
+        if self.manifest is not None:
+            return self.manifest.docs
+        def build(visited):
+            settings = self.get_doc_settings()
+            if settings is None:
+                return Catalog([], {}, [])
+            entries = self.scan_entries(settings["base"], settings["include"], settings["exclude"], visited)
+            return build_doc_catalog(entries, settings["identifier"])
+        return self._memoized("docs", build)
+
+    def _snapshot_key(self):
+        return (self.file_index.root, self.config_signature)
+
+    def save_snapshot(self):
+        """Persist the file index and the scan-derived memos (catalogs, module files)."""
+        path = snapshot_path(self.project_name)
+        if path is None:
+            return False
+        listings = self.file_index.export_listings()
+        memo = []
+        for key, (config_version, snapshot, value) in list(self._memo.items()):
+            name = key[0] if isinstance(key, tuple) else key
+            if config_version != self.config_version or name not in PERSISTED_MEMOS:
+                continue
+            # Only memos validated by the exported listings themselves can be restored
+            if any(listings.get(os.path.abspath(p)) is not listing for p, listing in snapshot):
+                continue
+            memo.append({"key": list(key) if isinstance(key, tuple) else key,
+                         "dirs": [p for p, _ in snapshot],
+                         "value": _encode_memo_value(value)})
+        state = {"listings": {p: listing.to_dict() for p, listing in listings.items()}, "memo": memo}
+        return save_snapshot(path, self._snapshot_key(), state)
+
+    def load_snapshot(self):
+        """Seed the file index and memos from a snapshot saved with the same root and configs."""
+        path = snapshot_path(self.project_name)
+        if path is None:
+            return False
+        state = load_snapshot(path, self._snapshot_key())
+        if state is None:
+            return False
+        try:
+            listings = {p: DirListing.from_dict(data) for p, data in state["listings"].items()
+                        if self.file_index.covers(p)}
+            memo = {}
+            for item in state["memo"]:
+                key = tuple(item["key"]) if isinstance(item["key"], list) else item["key"]
+                snapshot = [(p, listings.get(os.path.abspath(p))) for p in item["dirs"]]
+                memo[key] = (self.config_version, snapshot, _decode_memo_value(item["value"]))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Ignoring malformed index snapshot %s: %s", path, e)
+            return False
+        self.file_index.import_listings(listings)
+        self._memo.update(memo)
+        logger.debug("Restored %s directory listings for project %s", len(listings), self.project_name)
+        return True
+
+    def _memoized(self, key, build):
+        """
+        Cache build(visited) per config version. build appends the directories it
+        scanned to visited; the result is reused while none of their listings changed.
+        """
+        cached = self._memo.get(key)
+        if cached is not None:
+            config_version, snapshot, value = cached
+            if config_version == self.config_version and self.file_index.is_current(snapshot):
+                return value
+        config_version = self.config_version
+        visited = []
+        value = build(visited)
+        self._memo[key] = (config_version, self.file_index.snapshot(visited), value)
+        return value
+
+    @timed
+    @coalesced
+    def get_all_components(self):
+        logger.debug("Fetching all components")
+        return self.get_component_catalog().identifiers
 
-        files = FileHandler.scan_files(base, includes, excludes)
-        # Filter by extension
-        filtered = [f for f in files if os.path.splitext(f)[1].lstrip(".") in file_extension]
-
-        if index_by == "folder":
-            # Find the folder that matches the identifier
-            folders = {}
-            for fpath in filtered:
-                rel = os.path.relpath(fpath, base)
-                folder = rel.split(os.sep)[0]
-                folders.setdefault(folder, []).append(fpath)
-
-            # Slugify check
-            mapped = {}
-            for k,v in folders.items():
-                key = slugify.slugify(k) if identifier_mode == "slugify" else k
-                mapped[key] = v
-
-            return mapped.get(identifier, [])
-
-        else:
-            # index by file
-            groups = {}
-            for fpath in filtered:
-                fname = os.path.splitext(os.path.basename(fpath))[0]
-                key = slugify.slugify(fname) if identifier_mode == "slugify" else fname
-                groups.setdefault(key, []).append(fpath)
-
-            # If file_groups = true, then one identifier per group
-            if file_groups:
-                # identifier corresponds to a group
-                return groups.get(identifier, [])
-            else:
-                # if file_groups=false each file is an identifier?
-                # That would mean one file per component.
-                # In that case, find the file that matches identifier
-                # If file_groups=false, identifier is per-file's base name.
-                return groups.get(identifier, [])
+    @timed
+    @coalesced
+    def get_component_files(self, identifier):
+        logger.debug("Fetching files for component %s", identifier)
+        return self.get_component_catalog().get(identifier)
 
+    @timed
+    @coalesced
     def get_all_components_files(self):
         # Utility for listing all component files (for code categories)
         logger.debug("Fetching all components files")
-        comp = self.project_config.get("components", {})
-        base = comp.get("base", "")
-        if not base:
-            return []
-        if not os.path.isabs(base):
-            base = os.path.join(self.project_path, base.lstrip("/."))
-
-        includes = comp.get("include", {})
-        if isinstance(includes, dict):
-            includes = includes.get("include", [])
-        excludes = comp.get("exclude", {})
-        if isinstance(excludes, dict):
-            excludes = excludes.get("exclude", [])
-
-        files = FileHandler.scan_files(base, includes, excludes)
-        return files
+        return self.get_component_catalog().all_files
 
+    @timed
+    @coalesced
     def get_documentation_list(self):
         logger.debug("Fetching documentation list")
-        docs = self.project_config.get("docs", {})
-        base = docs.get("base", "")
-        identifier_mode = docs.get("identifier", "slugify")
-
-        if not base:
-            return []
-
-        if not os.path.isabs(base):
-            base = os.path.join(self.project_path, base.lstrip("/."))
-
-        includes = docs.get("include", [])
-        excludes = docs.get("exclude", [])
-
-        files = FileHandler.scan_files(base, includes, excludes)
-        # Filter for markdown files only
-        docs_files = [f for f in files if f.endswith(".md")]
+        return self.get_doc_catalog().identifiers
 
-        # Identifier logic
-        doc_ids = []
-        for fpath in docs_files:
-            fname = os.path.splitext(os.path.basename(fpath))[0]
-            doc_id = slugify.slugify(fname) if identifier_mode == "slugify" else fname
-            doc_ids.append(doc_id)
-
-        return doc_ids
+    def get_documentation_path(self, identifier):
+        files = self.get_doc_catalog().get(identifier)
+        return files[0] if files else None
 
+    @timed
+    @coalesced
     def get_documentation_file(self, identifier):
-        logger.debug(f"Fetching documentation file {identifier}")
-        docs = self.project_config.get("docs", {})
-        base = docs.get("base", "")
-        identifier_mode = docs.get("identifier", "slugify")
-
-        if not base:
-            return None
-
-        if not os.path.isabs(base):
-            base = os.path.join(self.project_path, base.lstrip("/."))
-
-        includes = docs.get("include", [])
-        excludes = docs.get("exclude", [])
-        files = FileHandler.scan_files(base, includes, excludes)
-        md_files = [f for f in files if f.endswith(".md")]
-
-        mapped = {}
-        for fpath in md_files:
-            fname = os.path.splitext(os.path.basename(fpath))[0]
-            doc_id = slugify.slugify(fname) if identifier_mode == "slugify" else fname
-            mapped[doc_id] = fpath
-
-        selected = mapped.get(identifier)
+        logger.debug("Fetching documentation file %s", identifier)
+        selected = self.get_documentation_path(identifier)
         if selected:
             content = FileHandler.read_file(selected)
             title = os.path.basename(selected)
             return {"title": title, "content": content}
         return None
 
+    def get_content_hash(self, path):
+        """Content hash of path recorded in the manifest, or None."""
+        manifest = self.manifest
+        return manifest.hashes.get(path) if manifest is not None else None
+
+    def get_file_listing(self):
+        """
+        Sorted listing of the files returned by get_project_files_by_category, one item
+        per (path, category), used by the paginated /code endpoint.
+        """
+        # Categories are memoized on the scanned directories, so this only revalidates
+        # their listings; the sorted listing is rebuilt when a new result comes back
+        data = self.get_project_files_by_category()
+
+        def build():
+            items = []
+            for category, files in data.items():
+                for path in files:
+                    name = os.path.basename(path)
+                    items.append({
+                        "path": path,
+                        "relpath": os.path.relpath(path, self.project_path).replace(os.sep, "/"),
+                        "name": name,
+                        "ext": os.path.splitext(name)[1].lstrip("."),
+                        "category": category,
+                        "hash": self.get_content_hash(path),
+                    })
+            return SortedListing(items, key=lambda item: (item["relpath"], item["category"]))
+        return self._sorted_listing("code", data, build)
+
+    def get_doc_listing(self):
+        """Sorted listing of documentation identifiers and their files."""
+        catalog = self.get_doc_catalog()
+
+        def build():
+            items = []
+            for doc_id in catalog.identifiers:
+                path = catalog.get(doc_id)[0]
+                name = os.path.basename(path)
+                items.append({"id": doc_id, "path": path, "name": name,
+                              "ext": os.path.splitext(name)[1].lstrip(".")})
+            return SortedListing(items, key=lambda item: (item["id"], item["path"]))
+        return self._sorted_listing("docs", catalog, build)
+
+    def get_module_listing(self):
+        """Sorted listing of the modules defined in project.config.json5."""
+        def build():
+            items = [{"name": name, "base": mod.get("base", ""), "include": mod.get("include", []),
+                      "exclude": mod.get("exclude", [])}
+                     for name, mod in self.project_config.get("modules", {}).items()]
+            return SortedListing(items, key=lambda item: (item["name"],))
+        return self._sorted_listing("modules", self.config_version, build)
+
+    def _sorted_listing(self, name, source, build):
+        """Reuse the listing built for the same source (compared by identity or equality)."""
+        cached = self._listings.get(name)
+        if cached is not None and (cached[0] is source or cached[0] == source):
+            return cached[1]
+        listing = build()
+        self._listings[name] = (source, listing)
+        return listing
+
+    def get_search_index(self):
+        """Return the project's SearchIndex, synced with the current tree."""
+        with self._search_lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex()
+            entries = self._memoized("search_entries", lambda visited: self.scan_entries(
+                self.project_path, excludes=self.exclude_patterns, visited=visited))
+            # With inotify watching every directory, changed files are pushed as dirty paths;
+            # polling misses in-place edits, so files are then re-stat'ed periodically
+            self._search_index.sync(entries, full_check=not (self.watched and watcher.reports_file_changes))
+            return self._search_index
+
+    @timed
+    @coalesced
+    def search(self, query, limit=20):
+        logger.debug("Searching project for %r", query)
+        return self.get_search_index().search(query, limit)
+
+    @timed
+    @coalesced
     def get_project_styles(self):
         # Similar logic as above. If styles are global, we can define in config.
         logger.debug("Fetching project styles")
+        if self.manifest is not None:
+            return self.manifest.styles
         # For this example, assume styles are something like *.css files in project_path/styles
         styles_path = os.path.join(self.project_path, "styles")
         if not os.path.isdir(styles_path):
             return []
-        files = FileHandler.scan_files(styles_path, excludes=self.exclude_patterns)
-        css_files = [f for f in files if f.endswith(".css")]
+        entries = self.scan_entries(styles_path, excludes=self.exclude_patterns)
+        css_files = [e.path for e in entries if e.ext == "css"]
         return css_files
@@ -0,0 +1,175 @@
+# services/search_index.py
+"""
+@file services/search_index.py
+@brief Per-project inverted index (token -> file -> line numbers) over the text
+       files of a project, updated incrementally as files change, with tf-idf
+       ranked results and line snippets.
+"""
+import math
+import re
+import threading
+import time
+from config import Config
+from logger import get_logger
+from utils.file_handler import FileHandler
+
+logger = get_logger(__name__)
+
+TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+")
+CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+# Line numbers kept per token and file; enough for snippets and term frequency
+MAX_LINES_PER_POSTING = 64
+
+def tokenize(text):
+    """
+    Split text into lowercase tokens. Identifiers are indexed whole and by their
+    snake_case / camelCase parts, so "getUserName" also matches "user".
+    """
+    tokens = []
+    for match in TOKEN_RE.finditer(text):
+        word = match.group(0)
+        tokens.append(word.lower())
+        if "_" in word or not (word.islower() or word.isupper()):
+            for part in word.split("_"):
+                for sub in CAMEL_RE.findall(part):
+                    sub = sub.lower()
+                    if sub != word.lower():
+                        tokens.append(sub)
+    return tokens
+
+class SearchIndex:
+    def __init__(self, max_file_bytes=None, refresh_interval=None):
+        self.max_file_bytes = Config.SEARCH_MAX_FILE_BYTES if max_file_bytes is None else max_file_bytes
+        self.refresh_interval = Config.SEARCH_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        # path -> (signature, {token: [line numbers]})
+        self._files = {}
+        # token -> {path: [line numbers]}
+        self._postings = {}
+        self._dirty = set()
+        self._entries = None
+        self._last_full_check = 0.0
+        self._lock = threading.RLock()
+
+    def mark_dirty(self, path):
+        """Force path to be re-checked on the next sync (called on watcher events)."""
+        with self._lock:
+            self._dirty.add(path)
+
+    def sync(self, entries, full_check=True):
+        """
+        Bring the index in line with entries (a list of FileEntry). New files are
+        indexed and removed files dropped whenever the list changes; existing files
+        are re-stat'ed at most every refresh_interval seconds when full_check is set,
+        and otherwise only if marked dirty.
+        """
+        with self._lock:
+            now = time.monotonic()
+            check_all = full_check and now - self._last_full_check >= self.refresh_interval
+            if entries is self._entries and not check_all and not self._dirty:
+                return
+            paths = {e.path: e for e in entries}
+            if entries is not self._entries:
+                for path in [p for p in self._files if p not in paths]:
+                    self._remove(path)
+            candidates = paths.keys() if check_all or entries is not self._entries else self._dirty
+            for path in list(candidates):
+                entry = paths.get(path)
+                if entry is None:
+                    self._remove(path)
+                    continue
+                signature = FileHandler.stat_signature(path, regular_only=True)
+                current = self._files.get(path)
+                if current is not None and current[0] == signature:
+                    continue
+                self._remove(path)
+                if signature is not None:
+                    self._add(path, signature)
+            self._dirty.clear()
+            self._entries = entries
+            if check_all:
+                self._last_full_check = now
+
+    def search(self, query, limit=20, snippet_lines=3):
+        """Return up to limit results ranked by tf-idf: [{path, score, matches: [{line, text}]}]."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            total = max(len(self._files), 1)
+            scores = {}
+            hits = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + total / len(postings))
+                for path, lines in postings.items():
+                    scores[path] = scores.get(path, 0.0) + (1 + math.log(len(lines))) * idf
+                    hits.setdefault(path, {})[term] = lines
+        # Prefer files matching more of the query terms
+        ranked = sorted(scores, key=lambda p: (-len(hits[p]) * scores[p], p))[:limit]
+
+        results = []
+        for path in ranked:
+            results.append({
+                "path": path,
+                "score": round(len(hits[path]) / len(terms) * scores[path], 4),
+                "matches": self._snippets(path, hits[path], snippet_lines),
+            })
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {"files": len(self._files), "tokens": len(self._postings)}
+
+    def _snippets(self, path, term_lines, count):
+        # Lines containing the most distinct query terms first
+        line_terms = {}
+        for lines in term_lines.values():
+            for n in lines:
+                line_terms[n] = line_terms.get(n, 0) + 1
+        best = sorted(line_terms, key=lambda n: (-line_terms[n], n))[:count]
+        try:
+            content = FileHandler.read_file(path, cache=False)
+        except (UnicodeDecodeError, OSError):
+            content = None
+        if not content:
+            # Removed or no longer readable since it was indexed
+            return []
+        text_lines = content.split("\n")
+        return [{"line": n, "text": text_lines[n - 1].strip()[:200]}
+                for n in sorted(best) if 0 < n <= len(text_lines)]
+
+    def _add(self, path, signature):
+        if signature[1] > self.max_file_bytes:
+            self._files[path] = (signature, {})
+            return
+        try:
+            content = FileHandler.read_file(path, cache=False)
+        except (UnicodeDecodeError, OSError):
+            content = None
+        if not content or "\0" in content[:8192]:
+            # Binary or unreadable files are remembered but not indexed
+            self._files[path] = (signature, {})
+            return
+        tokens = {}
+        for number, line in enumerate(content.split("\n"), 1):
+            for token in tokenize(line):
+                lines = tokens.setdefault(token, [])
+                if len(lines) < MAX_LINES_PER_POSTING and (not lines or lines[-1] != number):
+                    lines.append(number)
+        self._files[path] = (signature, tokens)
+        for token, lines in tokens.items():
+            self._postings.setdefault(token, {})[path] = lines
+
+    def _remove(self, path):
+        current = self._files.pop(path, None)
+        if current is None:
+            return
+        for token in current[1]:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(path, None)
+                if not postings:
+                    del self._postings[token]
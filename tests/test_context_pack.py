@@ -0,0 +1,37 @@
+# tests/test_context_pack.py
+"""
+@file tests/test_context_pack.py
+@brief Tests for ContextPack rendering.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.context_pack import ContextPack
+
+
+def test_markdown_lists_file_and_resource_errors(tmp_path):
+    (tmp_path / "a.py").write_text("print('a')\n")
+    pack = ContextPack(str(tmp_path), 10000)
+    pack.build([str(tmp_path / "a.py"), str(tmp_path / "missing.py")])
+    pack.errors = [{"resource": {"type": "doc", "id": "nope"}, "message": "Not found"},
+                   {"resource": "component:gone", "message": "Not found"}] + pack.errors
+
+    md = pack.to_markdown("demo")
+
+    assert "## a.py" in md
+    assert "- doc:nope: Not found\n" in md
+    assert "- component:gone: Not found\n" in md
+    assert "- missing.py: Not found\n" in md
+
+
+def test_small_files_fit_when_budget_is_below_truncation_floor(tmp_path):
+    (tmp_path / "spec.md").write_text("# Spec\n")
+    (tmp_path / "big.py").write_text("x = 1\n" * 100)
+    pack = ContextPack(str(tmp_path), 280, chars_per_token=4)
+    pack.build([str(tmp_path / "spec.md"), str(tmp_path / "big.py")])
+
+    assert [f["path"] for f in pack.files] == [str(tmp_path / "spec.md")]
+    assert not pack.files[0]["truncated"]
+    assert [f["path"] for f in pack.omitted] == [str(tmp_path / "big.py")]
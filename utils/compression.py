@@ -0,0 +1,101 @@
+# utils/compression.py
+"""
+@file utils/compression.py
+@brief Negotiated gzip/deflate response compression (stdlib zlib only) with a
+       size-bounded cache of compressed bodies keyed by ETag and encoding, so
+       repeated requests for the same representation skip the compression work.
+"""
+import threading
+import zlib
+from collections import OrderedDict
+from config import Config
+from utils.metrics import metrics
+
+SUPPORTED_ENCODINGS = ["gzip", "deflate"]
+
+# zlib wbits: 31 -> gzip container, 15 -> zlib container (HTTP "deflate")
+_WBITS = {"gzip": 31, "deflate": 15}
+
+COMPRESSIBLE_MIMETYPES = ("text/", "application/json")
+
+def is_compressible(mimetype):
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_MIMETYPES)
+
+def negotiate_encoding(accept_encodings):
+    """Pick the best supported encoding from a werkzeug Accept object (None for identity)."""
+    return accept_encodings.best_match(SUPPORTED_ENCODINGS)
+
+def compress(data, encoding, level=None):
+    comp = zlib.compressobj(Config.COMPRESS_LEVEL if level is None else level, zlib.DEFLATED, _WBITS[encoding])
+    return comp.compress(data) + comp.flush()
+
+def compress_stream(chunks, encoding, level=None, on_complete=None, max_collect=None):
+    """
+    Compress an iterable of bytes/str chunks on the fly. If on_complete is given, the
+    compressed body is also collected (up to max_collect bytes) and passed to it once
+    the stream finished.
+    """
+    comp = zlib.compressobj(Config.COMPRESS_LEVEL if level is None else level, zlib.DEFLATED, _WBITS[encoding])
+    collected = [] if on_complete is not None else None
+    collected_bytes = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        out = comp.compress(chunk)
+        if out:
+            if collected is not None:
+                collected_bytes += len(out)
+                if max_collect is not None and collected_bytes > max_collect:
+                    collected = None
+                else:
+                    collected.append(out)
+            yield out
+    out = comp.flush()
+    if collected is not None:
+        collected.append(out)
+        on_complete(b"".join(collected))
+    yield out
+
+class CompressedCache:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = Config.COMPRESS_CACHE_BYTES if max_bytes is None else max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag, encoding):
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((etag, encoding))
+            self.hits += 1
+            return body
+
+    def put(self, etag, encoding, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop((etag, encoding), None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._entries[(etag, encoding)] = body
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.current_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+compressed_cache = CompressedCache()
+
+metrics.register_collector("compressed_cache_hits_total", "Compressed body cache hits",
+                           lambda: {(): compressed_cache.stats()["hits"]}, "counter")
+metrics.register_collector("compressed_cache_misses_total", "Compressed body cache misses",
+                           lambda: {(): compressed_cache.stats()["misses"]}, "counter")
@@ -0,0 +1,87 @@
+# utils/content_cache.py
+"""
+@file utils/content_cache.py
+@brief Size-bounded LRU cache for file contents. Entries are keyed by path and
+       validated against the file's (mtime_ns, size), so a changed file is
+       never served from the cache.
+"""
+import threading
+from collections import OrderedDict
+from config import Config
+from utils.metrics import metrics
+
+class ContentCache:
+    def __init__(self, max_bytes=None, max_item_bytes=None):
+        """
+        max_bytes is the total budget (measured as on-disk file size); files larger
+        than max_item_bytes are never cached.
+        """
+        self.max_bytes = Config.CONTENT_CACHE_BYTES if max_bytes is None else max_bytes
+        self.max_item_bytes = Config.CONTENT_CACHE_MAX_FILE_BYTES if max_item_bytes is None else max_item_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cacheable(self, size):
+        return 0 < self.max_bytes and size <= min(self.max_item_bytes, self.max_bytes)
+
+    def get(self, path, signature):
+        """Return the cached content for path if it was stored with the same signature."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, path, signature, content):
+        size = signature[1]
+        if not self.cacheable(size):
+            return
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.current_bytes -= old[0][1]
+            self._entries[path] = (signature, content)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (old_signature, _) = self._entries.popitem(last=False)
+                self.current_bytes -= old_signature[1]
+                self.evictions += 1
+
+    def invalidate(self, path=None):
+        """Drop one path (or everything when path is None)."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.current_bytes -= old[0][1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+content_cache = ContentCache()
+
+def _collect(field):
+    return lambda: {(): content_cache.stats()[field]}
+
+metrics.register_collector("content_cache_hits_total", "File content cache hits", _collect("hits"), "counter")
+metrics.register_collector("content_cache_misses_total", "File content cache misses", _collect("misses"), "counter")
+metrics.register_collector("content_cache_evictions_total", "File content cache evictions", _collect("evictions"), "counter")
+metrics.register_collector("content_cache_bytes", "Bytes held by the file content cache", _collect("bytes"))
@@ -5,75 +5,233 @@
       and reading file contents.
 """
 import os
-import fnmatch
+import stat
+from config import Config
 from logger import get_logger
+from utils.content_cache import content_cache
+from utils.glob_matcher import compile_patterns
+from utils.metrics import BYTES_READ, PATTERN_EVALUATIONS, SCAN_DIRS, SCAN_FILES, SCAN_MATCHES
+from utils.tree_walk import get_scan_executor, read_directory, walk_tree
 
 logger = get_logger(__name__)
 
+class FileEntry:
+    """
+    Lightweight description of a scanned file. Stat data (size, mtime) is taken from
+    the os.DirEntry cache when available and otherwise only fetched on first access.
+    """
+    __slots__ = ("path", "relpath", "name", "_dir_entry", "_stat")
+
+    def __init__(self, path, relpath, name, dir_entry=None):
+        self.path = path
+        self.relpath = relpath
+        self.name = name
+        self._dir_entry = dir_entry
+        self._stat = None
+
+    @property
+    def stem(self):
+        return os.path.splitext(self.name)[0]
+
+    @property
+    def ext(self):
+        """Extension without the leading dot."""
+        return os.path.splitext(self.name)[1].lstrip(".")
+
+    def stat(self):
+        if self._stat is None:
+            if self._dir_entry is not None:
+                self._stat = self._dir_entry.stat()
+            else:
+                self._stat = os.stat(self.path)
+        return self._stat
+
+    @property
+    def size(self):
+        return self.stat().st_size
+
+    @property
+    def mtime(self):
+        return self.stat().st_mtime
+
+    def __repr__(self):
+        return f"FileEntry({self.path!r})"
+
 class FileHandler:
     @staticmethod
-    def scan_files(base_path, includes=None, excludes=None):
+    def scan_files(base_path, includes=None, excludes=None, index=None, follow_symlinks=False, workers=0):
         """
         Scan files in base_path applying include and exclude patterns.
-        includes and excludes are lists of glob-like patterns.
+        Returns a list of file paths; see iter_entries for the arguments.
         """
-        logger.debug(f"Scanning files in {base_path} with includes={includes}, excludes={excludes}")
-        if not os.path.isabs(base_path):
-            # If the base_path is relative, we assume it's relative to the project_path.
-            # The caller should ensure correctness.
-            pass
-
-        all_files = []
-        for root, dirs, files in os.walk(base_path):
-            # Filter excluded directories
-            dirs[:] = [d for d in dirs if not FileHandler._matches_any(os.path.join(root, d), excludes, is_dir=True)]
-            for f in files:
-                full_path = os.path.join(root, f)
-                # Check excludes
-                if FileHandler._matches_any(full_path, excludes):
-                    continue
-                # Check includes if specified
-                if includes:
-                    if FileHandler._matches_any(full_path, includes):
-                        all_files.append(full_path)
-                else:
-                    # If no includes specified, include all files unless excluded.
-                    all_files.append(full_path)
-
-        return all_files
+        return [e.path for e in FileHandler.iter_entries(base_path, includes, excludes, index, follow_symlinks, workers)]
 
     @staticmethod
-    def _matches_any(path, patterns, is_dir=False):
-        """Check if a path matches any given pattern. Patterns can use wildcards and **."""
-        if not patterns:
-            return False
-
-        # Convert path separators to forward slash for consistency in matching
-        normalized_path = path.replace(os.sep, "/")
-        for p in patterns:
-            # Patterns might also be something like "**/*.py,*.html"
-            # We'll split by "," and check each.
-            sub_patterns = [pt.strip() for pt in p.split(",")]
-            for sp in sub_patterns:
-                if fnmatch.fnmatch(normalized_path, sp):
-                    return True
-        return False
+    def iter_entries(base_path, includes=None, excludes=None, index=None, follow_symlinks=False, workers=0,
+                     visited=None):
+        """
+        Yield a FileEntry for every file in base_path matching the include and exclude patterns.
+        includes and excludes are lists of gitignore-style glob patterns matched
+        against the path relative to base_path (see utils/glob_matcher.py).
+        If a FileIndex covering base_path is given, the tree is read from the index
+        instead of walking the disk; otherwise it is walked with os.scandir.
+        Excluded directories are pruned before descent. Symlinked directories are
+        only followed when follow_symlinks is set, with loop detection.
+        With workers > 0, directories are listed on a shared thread pool of that size;
+        the output order is the same as for a sequential scan.
+        If visited is a list, the path of every directory walked is appended to it.
+        """
+        logger.debug("Scanning files in %s with includes=%s, excludes=%s", base_path, includes, excludes)
+        executor = get_scan_executor(workers) if workers else None
+        if index is not None and index.covers(base_path):
+            walker = index.walk(base_path, follow_symlinks, executor)
+        else:
+            walker = walk_tree(base_path, read_directory, follow_symlinks, executor)
+
+        exclude_matcher = compile_patterns(excludes)
+        include_matcher = compile_patterns(includes) if includes else None
+        base_len = len(base_path.rstrip(os.sep))
+
+        dirs_seen = files_seen = matched = evaluations = 0
+        try:
+            for root, dirs, files in walker:
+                dirs_seen += 1
+                files_seen += len(files)
+                if visited is not None:
+                    visited.append(root)
+                rel_root = root[base_len:].strip(os.sep).replace(os.sep, "/")
+                prefix = rel_root + "/" if rel_root else ""
+                # Prune excluded directories (and, for anchored includes, directories
+                # that can never contain a match) before descending into them
+                kept = []
+                for d in dirs:
+                    rel = prefix + d
+                    if exclude_matcher:
+                        evaluations += 1
+                        if exclude_matcher.matches(rel, is_dir=True):
+                            continue
+                    if include_matcher:
+                        evaluations += 1
+                        if not include_matcher.could_contain(rel):
+                            continue
+                    kept.append(d)
+                dirs[:] = kept
+                for f in files:
+                    # The index yields names, the scandir walker yields DirEntry objects
+                    dir_entry = None if isinstance(f, str) else f
+                    name = f if dir_entry is None else f.name
+                    rel = prefix + name
+                    # Check excludes
+                    if exclude_matcher:
+                        evaluations += 1
+                        if exclude_matcher.matches(rel):
+                            continue
+                    # Check includes if specified; otherwise include all files unless excluded
+                    if include_matcher is not None:
+                        evaluations += 1
+                        if not include_matcher.matches(rel):
+                            continue
+                    matched += 1
+                    yield FileEntry(os.path.join(root, name), rel, name, dir_entry)
+        finally:
+            SCAN_DIRS.inc(dirs_seen)
+            SCAN_FILES.inc(files_seen)
+            SCAN_MATCHES.inc(matched)
+            PATTERN_EVALUATIONS.inc(evaluations)
 
     @staticmethod
-    def read_file(path):
-        """Read the contents of a file and return as string."""
-        logger.debug(f"Reading file {path}")
-        if not os.path.isfile(path):
+    def read_file(path, cache=True):
+        """
+        Read the contents of a file and return as string.
+        Contents are served from the shared content cache while the file's
+        (mtime_ns, size) is unchanged. Bulk readers (e.g. indexing) pass cache=False
+        to read from disk without touching the cache.
+        """
+        logger.debug("Reading file %s", path)
+        signature = FileHandler.stat_signature(path, regular_only=True)
+        if signature is None:
             return None
+        if cache:
+            content = content_cache.get(path, signature)
+            if content is not None:
+                return content
         with open(path, "r", encoding="utf-8") as f:
-            return f.read()
+            content = f.read()
+        BYTES_READ.inc(signature[1])
+        if cache:
+            content_cache.put(path, signature, content)
+        return content
+
+    @staticmethod
+    def read_file_head(path, max_chars):
+        """
+        Return (text, truncated) with at most max_chars characters from the start of
+        the file, without reading the rest of it. Returns (None, False) if it does not exist.
+        """
+        signature = FileHandler.stat_signature(path, regular_only=True)
+        if signature is None:
+            return None, False
+        content = content_cache.get(path, signature)
+        if content is None and content_cache.cacheable(signature[1]) and signature[1] <= max_chars:
+            content = FileHandler.read_file(path)
+        if content is not None:
+            return content[:max_chars], len(content) > max_chars
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read(max_chars + 1)
+        BYTES_READ.inc(len(content))
+        return content[:max_chars], len(content) > max_chars
+
+    @staticmethod
+    def iter_file_chunks(path, chunk_size=None):
+        """
+        Yield the contents of a text file in chunks of chunk_size characters.
+        Files small enough for the content cache are served through read_file;
+        larger ones are streamed from disk.
+        Returns None instead of a generator if the file does not exist.
+        """
+        logger.debug("Streaming file %s", path)
+        signature = FileHandler.stat_signature(path, regular_only=True)
+        if signature is None:
+            return None
+        chunk_size = chunk_size or Config.STREAM_CHUNK_SIZE
+        if content_cache.cacheable(signature[1]):
+            content = FileHandler.read_file(path)
+            if content is None:
+                return None
+            return (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+        return FileHandler._read_chunks(path, chunk_size)
+
+    @staticmethod
+    def _read_chunks(path, chunk_size):
+        with open(path, "r", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                BYTES_READ.inc(len(chunk))
+                yield chunk
+
+    @staticmethod
+    def stat_signature(path, regular_only=False):
+        """
+        Return a cheap (mtime_ns, size) signature for path, or None if it does not exist
+        (or, with regular_only, is not a regular file).
+        Used to detect on-disk changes without reading the file.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if regular_only and not stat.S_ISREG(st.st_mode):
+            return None
+        return (st.st_mtime_ns, st.st_size)
 
     @staticmethod
     def ensure_json5_file(path, default_content):
         """
         Ensure a JSON5 file exists at 'path'. If not, create it with default_content.
         """
-        logger.debug(f"Ensuring json5 file at {path}")
+        logger.debug("Ensuring json5 file at %s", path)
         if not os.path.exists(path):
             with open(path, "w", encoding="utf-8") as f:
                 f.write(default_content)
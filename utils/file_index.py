@@ -0,0 +1,154 @@
+# utils/file_index.py
+"""
+@file utils/file_index.py
+@brief In-memory directory index for a project tree. Directory listings are cached
+       and only re-read when a directory's mtime changes, so repeated scans are
+       answered from memory instead of walking the disk again.
+"""
+import os
+import time
+import threading
+from config import Config
+from logger import get_logger
+from utils.tree_walk import read_directory, walk_tree
+
+logger = get_logger(__name__)
+
+class FileIndex:
+    def __init__(self, root, ttl=None):
+        """
+        root is the top directory of the project tree. Listings younger than ttl seconds
+        are served without touching the disk; older ones are revalidated with one stat.
+        """
+        self.root = os.path.abspath(root)
+        self.ttl = Config.FILE_INDEX_TTL if ttl is None else ttl
+        self.generation = 0
+        # Set when a FileWatcher pushes invalidations for this tree; listings are then
+        # trusted until invalidated instead of being revalidated after ttl seconds.
+        self.watcher = None
+        # Optional callback(path, listing) called whenever a directory is (re)listed
+        self.on_listed = None
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def covers(self, path):
+        """Return True if path lies inside the indexed tree."""
+        path = os.path.abspath(path)
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def listing(self, path):
+        """
+        Return the DirListing for path, re-reading the directory only if its mtime changed.
+        Returns None if the directory does not exist.
+        """
+        path = os.path.abspath(path)
+        now = time.monotonic()
+        cached = self._dirs.get(path)
+        if cached is not None and not cached.racy:
+            if now - cached.checked_at < self.ttl or (self.watcher is not None and self.watcher.running):
+                return cached
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+
+        if cached is not None and not cached.racy and cached.mtime_ns == st.st_mtime_ns:
+            cached.checked_at = now
+            return cached
+
+        listing = self._read_dir(path, st, now)
+        if listing is None:
+            return None
+        with self._lock:
+            if cached is not None:
+                for name in set(cached.dirs) - set(listing.dirs):
+                    self._drop_subtree(os.path.join(path, name))
+            self._dirs[path] = listing
+            if cached is None or cached.dirs != listing.dirs or cached.files != listing.files:
+                self.generation += 1
+        if self.on_listed is not None:
+            self.on_listed(path, listing)
+        return listing
+
+    def walk(self, top, follow_symlinks=False, executor=None):
+        """
+        os.walk-compatible top-down generator served from the index.
+        Callers may prune by modifying the yielded dirs list in place.
+        Symlinked directories are only descended into when follow_symlinks is set,
+        in which case directories already visited (symlink loops) are skipped.
+        Revalidation of stale listings runs on executor when one is given.
+        """
+        return walk_tree(top, self.listing, follow_symlinks, executor)
+
+    def export_listings(self):
+        """
+        Return the cached listings for persisting. Racy listings are left out: the
+        directory may have changed without its mtime moving, so they cannot be trusted later.
+        """
+        with self._lock:
+            return {path: listing for path, listing in self._dirs.items() if not listing.racy}
+
+    def import_listings(self, listings):
+        """
+        Seed the index with listings from an earlier export. They are revalidated
+        against the directory mtime (or by the watcher) before first use.
+        """
+        for listing in listings.values():
+            listing.checked_at = float("-inf")
+        with self._lock:
+            self._dirs.update(listings)
+            self.generation += 1
+
+    def replay_listed(self):
+        """Call on_listed for every cached listing, e.g. when a watcher is attached late."""
+        if self.on_listed is None:
+            return
+        for path, listing in list(self._dirs.items()):
+            self.on_listed(path, listing)
+
+    def snapshot(self, paths):
+        """Capture the current listings of paths, to be checked later with is_current()."""
+        return [(p, self._dirs.get(os.path.abspath(p))) for p in paths]
+
+    def is_current(self, snapshot):
+        """
+        Return True if none of the directories in snapshot changed since it was taken.
+        Listings are revalidated as usual, so this costs at most one stat per directory.
+        """
+        for path, listing in snapshot:
+            if listing is None or self.listing(path) is not listing:
+                return False
+        return True
+
+    def invalidate(self, path=None, recursive=True):
+        """
+        Forget the cached listing for path and, if recursive, everything below it
+        (or the whole index when path is None).
+        """
+        with self._lock:
+            if path is None:
+                self._dirs.clear()
+            elif recursive:
+                self._drop_subtree(os.path.abspath(path))
+            else:
+                self._dirs.pop(os.path.abspath(path), None)
+            self.generation += 1
+
+    def _drop_subtree(self, path):
+        self._dirs.pop(path, None)
+        prefix = path + os.sep
+        for key in [k for k in self._dirs if k.startswith(prefix)]:
+            del self._dirs[key]
+
+    def _read_dir(self, path, st, now):
+        listing = read_directory(path, st)
+        if listing is None:
+            return None
+        # Only names are kept in the index; DirEntry stat data would go stale
+        listing.files = tuple(e.name for e in listing.files)
+        listing.dirs = tuple(listing.dirs)
+        listing.links = frozenset(listing.links)
+        listing.checked_at = now
+        return listing
@@ -0,0 +1,176 @@
+# utils/glob_matcher.py
+"""
+@file utils/glob_matcher.py
+@brief Compiles include/exclude glob patterns into regular expressions once,
+       with gitignore-style semantics:
+       - patterns are matched against the path relative to the scan base
+       - a pattern without a "/" matches at any depth ("*.py", "node_modules")
+       - a pattern containing a "/" is anchored to the base ("src/**/*.ts")
+       - "**" matches any number of directories, "*" and "?" never cross "/"
+       - a trailing "/" only matches directories ("build/")
+       - a leading "!" re-includes paths matched by an earlier pattern
+       - matching a directory also matches everything below it
+"""
+import re
+from functools import lru_cache
+
+def split_patterns(patterns):
+    """Flatten a list of (possibly comma separated) patterns into a tuple of single patterns."""
+    if not patterns:
+        return ()
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    result = []
+    for p in patterns:
+        for sp in str(p).split(","):
+            sp = sp.strip()
+            if sp:
+                result.append(sp)
+    return tuple(result)
+
+def _translate(pattern):
+    """Translate a single glob (without "!" or trailing "/") into a regex body."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                after = i + 2
+                if at_start and after < n and pattern[after] == "/":
+                    # "**/" matches zero or more directories
+                    out.append("(?:.*/)?")
+                    i = after + 1
+                    continue
+                if at_start and after == n:
+                    # trailing "**" matches everything below
+                    out.append(".*")
+                    i = after
+                    continue
+                out.append("[^/]*")
+                i = after
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append("\\[")
+            else:
+                body = pattern[i + 1:j]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+class GlobRule:
+    __slots__ = ("pattern", "negated", "dir_only", "anchored", "literal_parts", "full", "below")
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.negated = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if pattern.startswith("./"):
+            pattern = pattern[2:]
+        self.anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        # Leading literal directory parts, used to prune directories that can never match
+        self.literal_parts = []
+        if self.anchored:
+            for part in pattern.split("/")[:-1]:
+                if any(ch in part for ch in "*?["):
+                    break
+                self.literal_parts.append(part)
+
+        body = _translate(pattern)
+        if not self.anchored:
+            body = "(?:.*/)?" + body
+        self.full = body + "(?:/.*)?"
+        self.below = body + "/.*"
+
+class GlobMatcher:
+    def __init__(self, patterns):
+        self.patterns = split_patterns(patterns)
+        self.rules = [GlobRule(p) for p in self.patterns]
+        self.has_negation = any(r.negated for r in self.rules)
+
+        if self.rules and not self.has_negation:
+            # Single combined regex per kind of path: one regex call per entry
+            file_parts = [r.below if r.dir_only else r.full for r in self.rules]
+            dir_parts = [r.full for r in self.rules]
+            self._file_re = re.compile("(?:" + "|".join(file_parts) + ")\\Z")
+            self._dir_re = re.compile("(?:" + "|".join(dir_parts) + ")\\Z")
+        else:
+            self._file_re = self._dir_re = None
+            self._ordered = [
+                (re.compile("(?:" + (r.below if r.dir_only else r.full) + ")\\Z"),
+                 re.compile("(?:" + r.full + ")\\Z"),
+                 r.negated)
+                for r in self.rules
+            ]
+
+        # Prefix trie of literal directory parts; None means no pruning is possible
+        self._trie = None
+        if self.rules and all(r.anchored and not r.negated for r in self.rules):
+            self._trie = {}
+            for r in self.rules:
+                node = self._trie
+                for part in r.literal_parts:
+                    node = node.setdefault(part, {})
+                node[None] = True
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def matches(self, relpath, is_dir=False):
+        """Return True if relpath (relative to the scan base, "/" separated) is matched."""
+        if not self.rules:
+            return False
+        if self._file_re is not None:
+            regex = self._dir_re if is_dir else self._file_re
+            return regex.match(relpath) is not None
+        matched = False
+        for file_re, dir_re, negated in self._ordered:
+            if (dir_re if is_dir else file_re).match(relpath) is not None:
+                matched = not negated
+        return matched
+
+    def could_contain(self, rel_dir):
+        """
+        Return False only if no path below rel_dir can ever match, so the whole
+        directory can be skipped without looking at its entries.
+        """
+        if self._trie is None:
+            return True
+        node = self._trie
+        for part in rel_dir.split("/"):
+            if None in node:
+                return True
+            node = node.get(part)
+            if node is None:
+                return False
+        return True
+
+@lru_cache(maxsize=512)
+def _compile(patterns):
+    return GlobMatcher(patterns)
+
+def compile_patterns(patterns):
+    """Return a (cached) GlobMatcher for a list of patterns."""
+    return _compile(split_patterns(patterns))
@@ -0,0 +1,39 @@
+# utils/http_cache.py
+"""
+@file utils/http_cache.py
+@brief Computes cheap validators (ETag / Last-Modified) for responses from the
+       inputs they are built from: config signatures, listing data and the
+       (mtime, size) of the files they contain, without reading file contents.
+"""
+import hashlib
+from datetime import datetime, timezone
+from utils.file_handler import FileHandler
+
+def compute_validators(parts=(), paths=(), signatures=()):
+    """
+    Return (etag, last_modified) for a response.
+    parts: any repr()-able values the response depends on (request path, config signature, listings)
+    paths: files whose (mtime, size) the response depends on
+    signatures: (mtime_ns, size) signatures already known to the caller
+    last_modified is the newest mtime among paths/signatures (None if there are none).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+
+    latest_ns = 0
+    all_signatures = list(signatures)
+    for path in paths:
+        signature = FileHandler.stat_signature(path)
+        h.update(f"{path}\0{signature}\0".encode("utf-8", "surrogatepass"))
+        all_signatures.append(signature)
+    for signature in all_signatures:
+        if signature is not None:
+            h.update(repr(signature).encode())
+            latest_ns = max(latest_ns, signature[0])
+
+    last_modified = None
+    if latest_ns:
+        last_modified = datetime.fromtimestamp(latest_ns // 1_000_000_000, tz=timezone.utc)
+    return h.hexdigest(), last_modified
@@ -0,0 +1,65 @@
+# utils/index_snapshot.py
+"""
+@file utils/index_snapshot.py
+@brief On-disk snapshots of per-project index state, so a restarted server can
+       revalidate its directory listings and catalogs with one stat per directory
+       instead of walking every tree again. Snapshots are plain JSON: loading one
+       never executes code, whoever wrote the file.
+"""
+import json
+import os
+import tempfile
+from config import Config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the layout of the saved state changes
+SNAPSHOT_FORMAT = 2
+
+def snapshot_path(name):
+    """Return the snapshot file for name, or None when snapshots are disabled."""
+    if not Config.INDEX_SNAPSHOT_DIR:
+        return None
+    return os.path.join(Config.INDEX_SNAPSHOT_DIR, f"{name}.snapshot.json")
+
+def _normalise(value):
+    # Tuples come back from JSON as lists; compare keys in their stored form
+    return json.loads(json.dumps(value))
+
+def save_snapshot(path, key, state):
+    """
+    Atomically write state (JSON-serialisable) to path. key identifies what the state
+    was built from (root, config signatures) and must match for load_snapshot() to return it.
+    """
+    directory = os.path.dirname(path) or "."
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"format": SNAPSHOT_FORMAT, "key": key, "state": state}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Could not write index snapshot %s: %s", path, e)
+        return False
+    return True
+
+def load_snapshot(path, key):
+    """Return the state saved under key at path, or None if missing, outdated or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        snapshot_format, saved_key, state = data["format"], data["key"], data["state"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning("Ignoring unreadable index snapshot %s: %s", path, e)
+        return None
+    if snapshot_format != SNAPSHOT_FORMAT or saved_key != _normalise(key):
+        logger.debug("Ignoring outdated index snapshot %s", path)
+        return None
+    return state
@@ -0,0 +1,56 @@
+# utils/json_stream.py
+"""
+@file utils/json_stream.py
+@brief Incremental JSON encoding for streamed responses. Large string values
+       (e.g. file contents) can be supplied as iterables of chunks and are
+       encoded piece by piece instead of being built in memory first.
+"""
+import json
+from config import Config
+
+class StreamedText:
+    """An iterable of str chunks emitted as a single JSON string (None -> null)."""
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+def iter_json(value):
+    """Yield the JSON encoding of value in pieces."""
+    if isinstance(value, StreamedText):
+        if value.chunks is None:
+            yield "null"
+            return
+        yield '"'
+        for chunk in value.chunks:
+            # Escaping is per character, so chunks can be encoded independently
+            yield json.dumps(chunk)[1:-1]
+        yield '"'
+    elif isinstance(value, dict):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield ("," if i else "") + json.dumps(str(key)) + ":"
+            yield from iter_json(item)
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        yield "["
+        for i, item in enumerate(value):
+            if i:
+                yield ","
+            yield from iter_json(item)
+        yield "]"
+    else:
+        yield json.dumps(value)
+
+def coalesce(pieces, size=None):
+    """Merge small string pieces into chunks of roughly size characters."""
+    size = size or Config.STREAM_CHUNK_SIZE
+    buf = []
+    buffered = 0
+    for piece in pieces:
+        buf.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield "".join(buf)
+            buf = []
+            buffered = 0
+    if buf:
+        yield "".join(buf)
@@ -0,0 +1,282 @@
+# utils/metrics.py
+"""
+@file utils/metrics.py
+@brief Lightweight in-process instrumentation: counters and latency histograms
+       rendered in the Prometheus text exposition format. Cache statistics are
+       pulled from their owners by collectors when /metrics is scraped, so the
+       hot paths only pay for a lock and an addition. Pre-forked workers share
+       their values through a directory (see MetricsRegistry.share), so a scrape
+       of any worker reports the totals of all of them.
+"""
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    @staticmethod
+    def combine(total, value):
+        return total + value
+
+    def render(self, values=None):
+        values = self.values() if values is None else values
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labelvalues -> [bucket counts..., +Inf count, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def values(self):
+        with self._lock:
+            return {labelvalues: list(series) for labelvalues, series in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    @staticmethod
+    def combine(total, value):
+        return [a + b for a, b in zip(total, value)]
+
+    def render(self, values=None):
+        values = self.values() if values is None else values
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, series in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labelvalues)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        # Shared mode: directory holding one <pid>.json file of values per process
+        self.directory = None
+        self._baselines = {}
+        self._flusher = None
+        self._stop_flushing = threading.Event()
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, name, documentation, collect, metric_type="gauge", labelnames=()):
+        """collect() returns {labelvalues tuple: value}; it is only called when rendering."""
+        self._collectors.append((name, documentation, collect, metric_type, tuple(labelnames)))
+
+    def share(self, directory):
+        """
+        Aggregate with the other processes writing to directory: render() then
+        reports the sum over every process's last dump(). Counters of exited
+        processes keep counting; gauges only include live processes.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def reset(self):
+        """
+        Start counting from zero, e.g. in a forked worker whose parent already dumped
+        the values it inherited. Counter collectors are offset by their current value.
+        """
+        for metric in self._metrics:
+            metric.reset()
+        self._baselines = {name: collect() for name, _, collect, metric_type, _ in self._collectors
+                           if metric_type == "counter"}
+
+    def start_flushing(self, interval):
+        """dump() every interval seconds from a background thread until stop_flushing()."""
+        self._stop_flushing.clear()
+
+        def run():
+            while not self._stop_flushing.wait(interval):
+                try:
+                    self.dump()
+                except OSError:
+                    # Retried on the next tick; scrapes dump on their own as well
+                    pass
+        self._flusher = threading.Thread(target=run, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def stop_flushing(self):
+        """Stop the flush thread and write the final values."""
+        if self._flusher is not None:
+            self._stop_flushing.set()
+            self._flusher.join()
+            self._flusher = None
+        if self.directory is not None:
+            self.dump()
+
+    def dump(self, gauges=True):
+        """Write this process's values to the shared directory (gauges=False leaves gauges out)."""
+        state = self._local_state(gauges)
+        data = {
+            "metrics": {name: [[list(k), v] for k, v in values.items()] for name, values in state["metrics"].items()},
+            "collectors": {name: [[list(k), v] for k, v in values.items()]
+                           for name, values in state["collectors"].items()},
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, os.path.join(self.directory, f"{os.getpid()}.json"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _local_state(self, gauges=True):
+        collectors = {}
+        for name, _, collect, metric_type, _ in self._collectors:
+            if metric_type != "counter" and not gauges:
+                continue
+            values = collect()
+            baseline = self._baselines.get(name, {})
+            collectors[name] = {k: v - baseline.get(k, 0) for k, v in values.items()}
+        return {"metrics": {metric.name: metric.values() for metric in self._metrics},
+                "collectors": collectors}
+
+    def _shared_state(self):
+        self.dump()
+        metric_types = {metric.name: metric for metric in self._metrics}
+        collector_types = {name: metric_type for name, _, _, metric_type, _ in self._collectors}
+        state = {"metrics": {name: {} for name in metric_types}, "collectors": {name: {} for name in collector_types}}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                pid = int(filename[:-len(".json")])
+                with open(os.path.join(self.directory, filename), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = _process_alive(pid)
+            for name, series in data.get("metrics", {}).items():
+                metric = metric_types.get(name)
+                if metric is None:
+                    continue
+                merged = state["metrics"][name]
+                for labelvalues, value in series:
+                    key = tuple(labelvalues)
+                    merged[key] = metric.combine(merged[key], value) if key in merged else value
+            for name, series in data.get("collectors", {}).items():
+                metric_type = collector_types.get(name)
+                if metric_type is None or (metric_type != "counter" and not alive):
+                    continue
+                merged = state["collectors"][name]
+                for labelvalues, value in series:
+                    key = tuple(labelvalues)
+                    merged[key] = merged.get(key, 0) + value
+        return state
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        state = self._local_state() if self.directory is None else self._shared_state()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(state["metrics"][metric.name]))
+        for name, documentation, _, metric_type, labelnames in self._collectors:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labelvalues, value in sorted(state["collectors"][name].items()):
+                lines.append(f"{name}{_labels(labelnames, labelvalues)} {value}")
+        return "\n".join(lines) + "\n"
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+metrics = MetricsRegistry()
+
+REQUEST_LATENCY = metrics.histogram("http_request_duration_seconds", "Request latency by route",
+                                    ("route", "method", "status"))
+SERVICE_LATENCY = metrics.histogram("service_method_duration_seconds", "ProjectService method latency",
+                                    ("method",))
+SCAN_DIRS = metrics.counter("scan_directories_total", "Directories visited by file scans")
+SCAN_FILES = metrics.counter("scan_files_total", "Files considered by file scans")
+SCAN_MATCHES = metrics.counter("scan_files_matched_total", "Files returned by file scans")
+PATTERN_EVALUATIONS = metrics.counter("scan_pattern_evaluations_total", "Include/exclude pattern evaluations")
+BYTES_READ = metrics.counter("file_bytes_read_total", "Bytes read from project files on disk")
+
+def timed(method):
+    """Decorator recording the latency of a ProjectService method in SERVICE_LATENCY."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            SERVICE_LATENCY.observe(time.perf_counter() - start, name)
+    return wrapper
@@ -0,0 +1,59 @@
+# utils/pagination.py
+"""
+@file utils/pagination.py
+@brief Sorted listings with cursor pagination. Items are sorted once by a tuple key
+       whose first element is the string prefix filters apply to; a page is found
+       by bisecting the keys, so page N never materialises the pages before it.
+"""
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """Return the key encoded in cursor. Raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(key, list) or not all(isinstance(k, str) for k in key):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+class SortedListing:
+    def __init__(self, items, key):
+        """
+        items: list of dicts; key(item) returns a unique tuple of strings whose first
+        element is matched by prefix filters.
+        """
+        pairs = sorted(((key(item), item) for item in items), key=lambda p: p[0])
+        self.keys = [k for k, _ in pairs]
+        self.items = [item for _, item in pairs]
+
+    def __len__(self):
+        return len(self.items)
+
+    def page(self, limit, cursor=None, prefix="", predicate=None):
+        """
+        Return (items, next_cursor) for up to limit items after cursor whose key starts
+        with prefix and for which predicate(item) holds. next_cursor is None on the last page.
+        """
+        start = bisect_left(self.keys, (prefix,)) if prefix else 0
+        if cursor:
+            start = max(start, bisect_right(self.keys, decode_cursor(cursor)))
+        page = []
+        i = start
+        while i < len(self.items) and len(page) < limit:
+            if prefix and not self.keys[i][0].startswith(prefix):
+                break
+            item = self.items[i]
+            if predicate is None or predicate(item):
+                page.append(item)
+            i += 1
+        more = i < len(self.items) and (not prefix or self.keys[i][0].startswith(prefix))
+        next_cursor = encode_cursor(self.keys[i - 1]) if more and page else None
+        return page, next_cursor
@@ -0,0 +1,81 @@
+# utils/profiling.py
+"""
+@file utils/profiling.py
+@brief Per-request profiling with cProfile and tracemalloc. Only one request is
+       profiled at a time since tracemalloc is process-wide; the result is a short
+       text report (top functions and allocation sites) that can also be saved
+       together with the raw pstats dump.
+"""
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from config import Config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+_profiling_lock = threading.Lock()
+
+class RequestProfiler:
+    def __init__(self, cpu=True, memory=False, top=None):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top or Config.PROFILE_TOP
+        self.elapsed = None
+        self._profile = None
+        self._memory_snapshot = None
+        self._memory_peak = None
+        self._start = None
+
+    def start(self):
+        """Start profiling. Returns False (and does nothing) if another request is being profiled."""
+        if not _profiling_lock.acquire(blocking=False):
+            return False
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._start = time.perf_counter()
+        return True
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self._start
+        try:
+            if self._profile is not None:
+                self._profile.disable()
+            if self.memory:
+                self._memory_snapshot = tracemalloc.take_snapshot()
+                _, self._memory_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+        finally:
+            _profiling_lock.release()
+
+    def report(self):
+        out = io.StringIO()
+        out.write(f"Elapsed: {self.elapsed * 1000:.2f} ms\n")
+        if self._profile is not None:
+            out.write(f"\n== CPU (top {self.top} by cumulative time) ==\n")
+            stats = pstats.Stats(self._profile, stream=out)
+            stats.sort_stats("cumulative").print_stats(self.top)
+        if self._memory_snapshot is not None:
+            out.write(f"\n== Memory (peak {self._memory_peak / 1024:.1f} KiB, top {self.top} allocation sites) ==\n")
+            for stat in self._memory_snapshot.statistics("lineno")[:self.top]:
+                out.write(f"{stat}\n")
+        return out.getvalue()
+
+    def save(self, name, directory=None):
+        """Write <name>.txt (report) and, for CPU profiles, <name>.prof (pstats). Returns the report path."""
+        directory = directory or Config.PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, name)
+        if self._profile is not None:
+            self._profile.dump_stats(base + ".prof")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(self.report())
+        logger.info("Saved request profile %s", base)
+        return base + ".txt"
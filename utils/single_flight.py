@@ -0,0 +1,80 @@
+# utils/single_flight.py
+"""
+@file utils/single_flight.py
+@brief Request coalescing: concurrent calls with the same key share a single
+       execution and its result (or exception) instead of each doing the work.
+"""
+import functools
+import threading
+from utils.metrics import metrics
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self):
+        self.executed = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Run fn() unless a call with the same key is already in flight, in which case
+        wait for it and return its result. Results are shared and must not be mutated.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
+
+single_flight = SingleFlight()
+
+metrics.register_collector("single_flight_executed_total", "Coalesced calls that ran the computation",
+                           lambda: {(): single_flight.stats()["executed"]}, "counter")
+metrics.register_collector("single_flight_shared_total", "Coalesced calls that shared an in-flight result",
+                           lambda: {(): single_flight.stats()["shared"]}, "counter")
+
+def coalesced(method):
+    """
+    Decorator for ProjectService read methods: identical concurrent calls (same service
+    instance, method, arguments and config version) share one computation.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # config_version restarts at 1 in every new instance (e.g. after a registry
+        # eviction), so the instance itself is part of the key
+        key = (self.project_name, id(self), method.__name__, args, tuple(sorted(kwargs.items())),
+               self.config_version)
+        return single_flight.do(key, lambda: method(self, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,130 @@
+# utils/tree_walk.py
+"""
+@file utils/tree_walk.py
+@brief Directory tree traversal shared by the scandir scanner and the file index.
+       Supports an optional thread pool that lists subdirectories ahead of the
+       traversal, which hides per-directory latency on network-mounted trees while
+       keeping the exact output order of a sequential walk.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+# Directories modified this recently may still change within the same mtime tick,
+# so a cached listing of them must not be trusted.
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+class DirListing:
+    __slots__ = ("mtime_ns", "dev_ino", "dirs", "files", "links", "checked_at", "racy")
+
+    def __init__(self, mtime_ns, dev_ino, dirs, files, links, checked_at=None, racy=False):
+        self.mtime_ns = mtime_ns
+        self.dev_ino = dev_ino
+        self.dirs = dirs
+        self.files = files
+        self.links = links
+        self.checked_at = checked_at
+        self.racy = racy
+
+    def to_dict(self):
+        """JSON-serialisable form of an indexed listing (names only, see FileIndex)."""
+        return {"mtime_ns": self.mtime_ns, "dev_ino": list(self.dev_ino), "dirs": list(self.dirs),
+                "files": list(self.files), "links": sorted(self.links)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict(); raises KeyError / TypeError / ValueError on malformed data."""
+        dev, ino = data["dev_ino"]
+        dirs, files, links = (tuple(str(name) for name in data[key]) for key in ("dirs", "files", "links"))
+        return cls(int(data["mtime_ns"]), (int(dev), int(ino)), dirs, files, frozenset(links))
+
+def read_directory(path, st=None):
+    """
+    List one directory with os.scandir. Returns a DirListing whose files are os.DirEntry
+    objects sorted by name, or None if the directory cannot be read.
+    """
+    try:
+        if st is None:
+            st = os.stat(path)
+        dirs, files, links = [], [], set()
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirs.append(entry.name)
+                    if entry.is_symlink():
+                        links.add(entry.name)
+                else:
+                    files.append(entry)
+    except OSError as e:
+        logger.debug("Could not list %s: %s", path, e)
+        return None
+    dirs.sort()
+    files.sort(key=lambda e: e.name)
+    racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+    return DirListing(st.st_mtime_ns, (st.st_dev, st.st_ino), dirs, files, links, racy=racy)
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_scan_executor(workers=None):
+    """Return the shared scan thread pool for the given number of workers."""
+    workers = max(1, int(workers or Config.SCAN_WORKERS))
+    with _executors_lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"scan{workers}")
+            _executors[workers] = executor
+        return executor
+
+def shutdown_scan_executors():
+    """Stop the shared scan pools (e.g. before forking); they are recreated on demand."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+def walk_tree(top, list_dir, follow_symlinks=False, executor=None):
+    """
+    Top-down generator yielding (root, dir_names, files) like os.walk.
+    list_dir(path) must return an object with dirs, files, links and dev_ino
+    attributes (see DirListing) or None if path cannot be listed.
+    Callers may prune by modifying dir_names in place. When an executor is given,
+    the remaining subdirectories of each directory are listed concurrently.
+    """
+    seen = set() if follow_symlinks else None
+    if executor is None:
+        yield from _walk(top, list_dir(top), list_dir, seen, None)
+    else:
+        yield from _walk(top, executor.submit(list_dir, top), list_dir, seen, executor)
+
+def _walk(path, listing, list_dir, seen, executor):
+    if executor is not None:
+        listing = listing.result()
+    if listing is None:
+        return
+    if seen is not None:
+        if listing.dev_ino in seen:
+            return
+        seen.add(listing.dev_ino)
+
+    dirs = list(listing.dirs)
+    yield path, dirs, list(listing.files)
+
+    children = [os.path.join(path, d) for d in dirs if seen is not None or d not in listing.links]
+    if executor is None:
+        for child in children:
+            yield from _walk(child, list_dir(child), list_dir, seen, None)
+    else:
+        futures = [executor.submit(list_dir, child) for child in children]
+        for child, future in zip(children, futures):
+            yield from _walk(child, future, list_dir, seen, executor)
@@ -0,0 +1,334 @@
+# utils/watcher.py
+"""
+@file utils/watcher.py
+@brief Background filesystem watcher. Uses Linux inotify (through ctypes) when
+       available and falls back to polling directory mtimes / file signatures.
+       Listeners register interest in directories or single files and are called
+       from the watcher thread with (directory, name, kind) events, which lets the
+       in-memory indexes and caches stay correct without revalidating on every request.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+from config import Config
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Event kinds passed to listeners
+CREATED = "created"
+DELETED = "deleted"
+MODIFIED = "modified"
+CHANGED = "changed"      # directory contents changed, names unknown (polling)
+OVERFLOW = "overflow"    # events were lost; everything must be revalidated
+
+def _kind_for_mask(mask):
+    if mask & (IN_CREATE | IN_MOVED_TO):
+        return CREATED
+    if mask & (IN_DELETE | IN_MOVED_FROM | IN_DELETE_SELF | IN_MOVE_SELF):
+        return DELETED
+    return MODIFIED
+
+class Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """Yield (wd, mask, name) for all pending events."""
+        try:
+            buf = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            start = offset + _EVENT_HEADER.size
+            name = os.fsdecode(buf[start:start + length].rstrip(b"\0"))
+            offset = start + length
+            yield wd, mask, name
+
+    def close(self):
+        os.close(self.fd)
+
+class FileWatcher:
+    def __init__(self, mode=None, poll_interval=None):
+        """
+        mode is "auto" (inotify with polling fallback), "inotify" or "poll".
+        poll_interval bounds how stale polled directories can get (seconds).
+        """
+        self.mode = (mode or Config.WATCHER_MODE).lower()
+        self.poll_interval = Config.WATCHER_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.running = False
+        self._inotify = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake_r = self._wake_w = None
+        # directory -> {owner_key: callback}
+        self._listeners = {}
+        # directory -> wd and back (inotify) ; directory -> mtime_ns (polling)
+        self._wd_by_dir = {}
+        self._dir_by_wd = {}
+        self._polled = {}
+        # file path -> (signature, owner_key, callback) for polled single files
+        self._polled_files = {}
+
+    def start(self):
+        """Start the watcher thread. Safe to call more than once."""
+        if self.running:
+            return
+        if self.mode in ("auto", "inotify"):
+            try:
+                self._inotify = Inotify()
+            except OSError as e:
+                if self.mode == "inotify":
+                    raise
+                logger.info("inotify unavailable (%s), falling back to polling", e)
+        self._wake_r, self._wake_w = os.pipe()
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+        logger.info("File watcher started (%s)", "inotify" if self._inotify else "poll")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        os.write(self._wake_w, b"x")
+        self._thread.join(timeout=5)
+        for fd in (self._wake_r, self._wake_w):
+            os.close(fd)
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        with self._lock:
+            self._listeners.clear()
+            self._wd_by_dir.clear()
+            self._dir_by_wd.clear()
+            self._polled.clear()
+            self._polled_files.clear()
+
+    @property
+    def reports_file_changes(self):
+        """
+        True when every watched directory is watched by inotify, so in-place edits of
+        files are reported by name. Polling only notices directory mtime changes.
+        """
+        with self._lock:
+            return self.running and self._inotify is not None and not self._polled
+
+    def watch_dir(self, path, callback, owner, mtime_ns=None):
+        """
+        Call callback(path, name, kind) when entries of directory path change.
+        mtime_ns is the directory mtime the caller's view is based on; changes that
+        happened before the watch was in place are reported immediately.
+        """
+        if not self.running:
+            return
+        path = os.path.abspath(path)
+        with self._lock:
+            self._listeners.setdefault(path, {})[id(owner)] = callback
+            if path not in self._wd_by_dir and path not in self._polled:
+                self._add_dir_locked(path, mtime_ns)
+            elif path in self._polled and mtime_ns is not None:
+                self._polled[path] = mtime_ns
+        if mtime_ns is not None and self._inotify is not None:
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime_ns:
+                callback(path, None, CHANGED)
+
+    def watch_file(self, path, callback, owner):
+        """Call callback(directory, name, kind) when the file at path changes or is replaced."""
+        if not self.running:
+            return
+        path = os.path.abspath(path)
+        directory, name = os.path.split(path)
+
+        def on_dir_event(event_dir, event_name, kind):
+            if event_name is None or event_name == name or kind == OVERFLOW:
+                callback(event_dir, name, kind)
+
+        with self._lock:
+            if self._inotify is not None:
+                self._listeners.setdefault(directory, {})[(id(owner), name)] = on_dir_event
+                if directory not in self._wd_by_dir and directory not in self._polled:
+                    self._add_dir_locked(directory, None)
+            if self._inotify is None or directory in self._polled:
+                self._polled_files[path] = (_signature(path), id(owner), callback)
+
+    def unwatch_owner(self, owner):
+        """Remove every listener registered by owner and drop watches nobody needs anymore."""
+        key = id(owner)
+        with self._lock:
+            for directory in list(self._listeners):
+                listeners = self._listeners[directory]
+                for k in [k for k in listeners if k == key or (isinstance(k, tuple) and k[0] == key)]:
+                    del listeners[k]
+                if not listeners:
+                    self._remove_dir_locked(directory)
+            for path in [p for p, v in self._polled_files.items() if v[1] == key]:
+                del self._polled_files[path]
+
+    def _add_dir_locked(self, path, mtime_ns):
+        if self._inotify is not None:
+            try:
+                wd = self._inotify.add_watch(path)
+                self._wd_by_dir[path] = wd
+                self._dir_by_wd[wd] = path
+                return
+            except OSError as e:
+                # Any directory we cannot watch is polled, so its listing never goes unchecked
+                if e.errno in (errno.ENOSPC, errno.ENOMEM):
+                    logger.debug("inotify watch limit reached, polling %s", path)
+                else:
+                    logger.debug("Cannot watch %s (%s), polling it", path, e)
+        if mtime_ns is None:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                # Gone already: the first poll reports it as deleted
+                mtime_ns = -1
+        self._polled[path] = mtime_ns
+
+    def _remove_dir_locked(self, path):
+        self._listeners.pop(path, None)
+        self._polled.pop(path, None)
+        wd = self._wd_by_dir.pop(path, None)
+        if wd is not None:
+            self._dir_by_wd.pop(wd, None)
+            if self._inotify is not None:
+                self._inotify.rm_watch(wd)
+
+    def _dispatch(self, directory, name, kind):
+        with self._lock:
+            callbacks = list(self._listeners.get(directory, {}).values())
+        for callback in callbacks:
+            try:
+                callback(directory, name, kind)
+            except Exception as e:
+                logger.error("Watcher callback failed for %s: %s", directory, e)
+
+    def _dispatch_all(self, kind):
+        with self._lock:
+            directories = list(self._listeners)
+        for directory in directories:
+            self._dispatch(directory, None, kind)
+
+    def _run(self):
+        fds = [self._wake_r]
+        if self._inotify is not None:
+            fds.append(self._inotify.fd)
+        while self.running:
+            try:
+                readable, _, _ = select.select(fds, [], [], self.poll_interval)
+            except OSError as e:
+                logger.error("File watcher select failed: %s", e)
+                break
+            if self._wake_r in readable:
+                break
+            if self._inotify is not None and self._inotify.fd in readable:
+                self._process_inotify()
+            self._poll()
+        logger.info("File watcher stopped")
+
+    def _process_inotify(self):
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                logger.info("inotify queue overflow, invalidating all watched directories")
+                self._dispatch_all(OVERFLOW)
+                continue
+            with self._lock:
+                directory = self._dir_by_wd.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                with self._lock:
+                    self._wd_by_dir.pop(directory, None)
+                    self._dir_by_wd.pop(wd, None)
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                self._dispatch(directory, None, DELETED)
+            else:
+                self._dispatch(directory, name or None, _kind_for_mask(mask))
+
+    def _poll(self):
+        with self._lock:
+            polled = list(self._polled.items())
+            polled_files = list(self._polled_files.items())
+        for directory, mtime_ns in polled:
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime_ns:
+                with self._lock:
+                    if directory in self._polled:
+                        if current is None:
+                            self._polled.pop(directory)
+                        else:
+                            self._polled[directory] = current
+                self._dispatch(directory, None, CHANGED if current is not None else DELETED)
+        for path, (signature, owner_key, callback) in polled_files:
+            current = _signature(path)
+            if current != signature:
+                with self._lock:
+                    if path in self._polled_files:
+                        self._polled_files[path] = (current, owner_key, callback)
+                directory, name = os.path.split(path)
+                callback(directory, name, MODIFIED)
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+watcher = FileWatcher()